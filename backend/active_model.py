@@ -1,36 +1,234 @@
+import asyncio
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
 import pandas as pd
-import sqlite3
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
 
+try:
+    from backend.alerts_store import read_frame
+except ImportError:  # imported from inside backend/
+    from alerts_store import read_frame
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.getenv("CONFIDENCE_MODEL_PATH", os.path.join(BASE_DIR, "models", "confidence.pkl"))
+
+FEATURES = ['volume_z', 'Volume_Ratio', 'RSI', 'Close']
+
 def load_latest_alerts():
-    with sqlite3.connect("backend/alerts.db") as conn:
-        df = pd.read_sql_query("""
-            SELECT Ticker, Close, Volume, volume_z, Volume_Ratio, RSI
-            FROM latest_alerts
-        """, conn)
+    df = read_frame("""
+        SELECT Ticker, Close, Volume, volume_z, Volume_Ratio, RSI
+        FROM latest_alerts
+    """)
     return df
 
-def compute_features(df: pd.DataFrame):
-    X = df[['volume_z', 'Volume_Ratio', 'RSI', 'Close']].copy()
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    return X_scaled
+def load_active_alerts():
+    # Features of currently active alerts, from each ticker's most recent alert row
+    return read_frame("""
+        SELECT l.Ticker, l.Close, l.Volume, l.volume_z, l.Volume_Ratio, l.RSI
+        FROM active_alerts a JOIN alert_latest l ON l.Ticker = a.Ticker
+    """)
+
+def load_features_for_tickers(tickers):
+    # Latest alert features per ticker; tickers with no alert row are left out
+    tickers = [t.upper() for t in tickers]
+    if not tickers:
+        return pd.DataFrame(columns=['Ticker'] + FEATURES)
+    marks = ",".join("?" * len(tickers))
+    return read_frame(f"""
+        SELECT Ticker, Close, Volume, volume_z, Volume_Ratio, RSI
+        FROM alert_latest WHERE Ticker IN ({marks})
+    """, tickers)
+
+def load_training_data(days: int = 90):
+    return read_frame("""
+        SELECT Ticker, Close, Volume, volume_z, Volume_Ratio, RSI
+        FROM alert_history
+        WHERE Timestamp >= datetime('now', 'localtime', ?)
+    """, (f"-{int(days)} days",))
+
+def compute_features(df: pd.DataFrame, scaler: StandardScaler = None):
+    # Training fits a new scaler; inference reuses the fitted one from the saved model
+    X = df[FEATURES].astype(float).to_numpy()
+    if scaler is None:
+        scaler = StandardScaler()
+        scaler.fit(X)
+    return scaler.transform(X)
 
 # TRAINING OUR MODEL
 
-def train_dummy_model(df: pd.DataFrame):
+def train_dummy_model(df: pd.DataFrame) -> dict:
+    """Fit scaler + logistic regression; returns a model bundle for save_model/predict_confidence."""
+    df = df.dropna(subset=FEATURES)
     y = (df['Volume_Ratio'] > 3).astype(int)  # extreme volume spike indicates YES
-    X = compute_features(df)
+    if y.nunique() < 2:
+        raise ValueError(f"Need both classes to train, got {len(df)} rows of class {y.unique().tolist()}")
+    scaler = StandardScaler().fit(df[FEATURES].astype(float).to_numpy())
+    X = compute_features(df, scaler)
     model = LogisticRegression()
     model.fit(X,y)
-    return model
+    return {
+        'scaler': scaler,
+        'model': model,
+        'features': list(FEATURES),
+        'version': datetime.now().strftime("%Y%m%d%H%M%S"),
+        'n_rows': len(df),
+    }
+
+def save_model(bundle: dict, path: str = MODEL_PATH):
+    # Write then rename, so a reloading API process never reads a half-written file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(bundle, f)
+    os.replace(tmp, path)
+
+def load_model(path: str = MODEL_PATH) -> dict:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+def train_and_save(path: str = MODEL_PATH, days: int = 90) -> dict:
+    """Offline/scheduler training on recent alert history."""
+    bundle = train_dummy_model(load_training_data(days))
+    save_model(bundle, path)
+    return bundle
+
+class ModelRegistry:
+    """
+    Holds the loaded model bundle for the API process. The file is stat'ed at most every
+    check_interval seconds and reloaded when its mtime/size changes (a new version landed).
+    """
+
+    def __init__(self, path: str = MODEL_PATH, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._bundle = None
+        self._stamp = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._bundle['version'] if self._bundle else None
+
+    def get(self) -> dict:
+        """Current bundle (None if no model has been trained yet)."""
+        now = time.monotonic()
+        if self._bundle is not None and now - self._checked < self.check_interval:
+            return self._bundle
+        with self._lock:
+            self._checked = now
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return self._bundle
+            stamp = (st.st_mtime_ns, st.st_size)
+            if stamp != self._stamp:
+                self._bundle = load_model(self.path)
+                self._stamp = stamp
+            return self._bundle
+
+    def publish(self, bundle: dict):
+        """Save a freshly trained bundle and serve it from this process right away."""
+        with self._lock:
+            save_model(bundle, self.path)
+            st = os.stat(self.path)
+            self._bundle, self._stamp, self._checked = bundle, (st.st_mtime_ns, st.st_size), time.monotonic()
+
+_registry = ModelRegistry()
+
+def get_registry() -> ModelRegistry:
+    return _registry
 
 # Predicting Confidence with Logistic Regression:
 
-def predict_confidence(df: pd.DataFrame):
-    model = train_dummy_model(df)
-    X = compute_features(df)
-    probs = model.predict_proba(X)[:,1]  # probability of class 1 (alert)
-    df['Confidence'] = probs
+def score_matrix(X: np.ndarray, bundle: dict) -> np.ndarray:
+    """
+    P(class 1) for raw feature rows (columns in FEATURES order) as one matrix op:
+    sigmoid(((X - mean) / scale) @ coef + intercept), same as scaler.transform + predict_proba.
+    Rows with missing features score NaN.
+    """
+    scaler, model = bundle['scaler'], bundle['model']
+    X = np.asarray(X, dtype=float).reshape(-1, len(FEATURES))
+    logits = ((X - scaler.mean_) / scaler.scale_) @ model.coef_[0] + model.intercept_[0]
+    return 1.0 / (1.0 + np.exp(-logits))
+
+def to_columnar(tickers, probs, version) -> dict:
+    """Columnar JSON-ready scores: one list per field instead of one object per row (NaN -> None)."""
+    return {
+        'Ticker': list(tickers),
+        'Confidence': [None if np.isnan(p) else float(p) for p in probs],
+        'model_version': version,
+    }
+
+def predict_confidence(df: pd.DataFrame, registry: ModelRegistry = None):
+    registry = registry or _registry
+    bundle = registry.get()
+    if bundle is None:
+        # Training only happens offline (train_and_save / the scheduler's training job)
+        raise LookupError("No confidence model has been trained yet")
+    df['Confidence'] = score_matrix(df[FEATURES].to_numpy(dtype=float), bundle)  # probability of class 1 (alert)
     return df[['Ticker', 'Confidence']]
+
+class ConfidenceBatcher:
+    """
+    Asyncio micro-batcher: concurrent score() calls arriving within max_wait_ms of each other
+    (up to max_rows rows) are stacked into one matrix and scored with a single score_matrix call.
+    """
+
+    def __init__(self, registry: ModelRegistry = None, max_wait_ms: float = 2.0, max_rows: int = 4096):
+        self.registry = registry or _registry
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_rows = max_rows
+        self._queue = None
+        self._worker = None
+        self.batches = 0
+        self.requests = 0
+
+    async def score(self, X: np.ndarray) -> np.ndarray:
+        """Score raw feature rows (FEATURES order); merged with other concurrent callers."""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((np.asarray(X, dtype=float).reshape(-1, len(FEATURES)), fut))
+        return await fut
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            rows = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while rows < self.max_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            try:
+                bundle = self.registry.get()
+                if bundle is None:
+                    raise LookupError("No confidence model has been trained yet")
+                probs = score_matrix(np.vstack([X for X, _ in batch]), bundle)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            self.batches += 1
+            self.requests += len(batch)
+            start = 0
+            for X, fut in batch:
+                if not fut.done():
+                    fut.set_result(probs[start:start + len(X)])
+                start += len(X)
@@ -0,0 +1,169 @@
+"""
+Append-only alert history in alerts.db.
+
+Every pipeline run appends its alert rows to alert_history (and the run
+itself to alert_runs) instead of overwriting latest_alerts. A trigger
+keeps alert_latest (one row per ticker, its most recent alert) up to
+date on insert, and latest_alerts is a view over alert_latest restricted
+to the most recent run, so existing readers keep working. Range queries
+by ticker or by level use the (Ticker, Timestamp) and (Volume_Alert,
+Timestamp) indexes.
+"""
+
+# backend/alert_history.py
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+try:
+    from backend.alerts_store import read_frame, transaction
+except ImportError:  # imported from inside backend/
+    from alerts_store import read_frame, transaction
+
+TS_FMT = "%Y-%m-%d %H:%M:%S"
+ALERT_COLUMNS = ["Ticker", "Close", "Volume", "volume_z", "Volume_Ratio", "Volume_Alert", "RSI", "Timestamp"]
+
+
+def setup_alert_history(conn) -> None:
+    """Create history tables, indexes, trigger and the latest_alerts view (migrating an old latest_alerts table)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS alert_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            Ticker TEXT NOT NULL,
+            Close REAL,
+            Volume INTEGER,
+            volume_z REAL,
+            Volume_Ratio REAL,
+            Volume_Alert TEXT,
+            RSI REAL,
+            Timestamp TEXT NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_alert_history_ticker_ts ON alert_history (Ticker, Timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_alert_history_level_ts ON alert_history (Volume_Alert, Timestamp)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS alert_latest (
+            Ticker TEXT PRIMARY KEY,
+            Close REAL,
+            Volume INTEGER,
+            volume_z REAL,
+            Volume_Ratio REAL,
+            Volume_Alert TEXT,
+            RSI REAL,
+            Timestamp TEXT NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_alert_latest_ts ON alert_latest (Timestamp)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS alert_runs (
+            Timestamp TEXT PRIMARY KEY,
+            n_alerts INTEGER
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_alert_history_latest AFTER INSERT ON alert_history
+        BEGIN
+            INSERT INTO alert_latest (Ticker, Close, Volume, volume_z, Volume_Ratio, Volume_Alert, RSI, Timestamp)
+            VALUES (NEW.Ticker, NEW.Close, NEW.Volume, NEW.volume_z, NEW.Volume_Ratio, NEW.Volume_Alert, NEW.RSI, NEW.Timestamp)
+            ON CONFLICT(Ticker) DO UPDATE SET
+                Close=excluded.Close, Volume=excluded.Volume, volume_z=excluded.volume_z,
+                Volume_Ratio=excluded.Volume_Ratio, Volume_Alert=excluded.Volume_Alert,
+                RSI=excluded.RSI, Timestamp=excluded.Timestamp
+            WHERE excluded.Timestamp >= alert_latest.Timestamp;
+        END
+    """)
+    kind = conn.execute("SELECT type FROM sqlite_master WHERE name='latest_alerts'").fetchone()
+    if kind and kind[0] == "table":
+        # latest_alerts used to be rewritten every run; keep its last run as the start of the history
+        cols = ", ".join(ALERT_COLUMNS)
+        conn.execute(f"INSERT INTO alert_history ({cols}) SELECT {cols} FROM latest_alerts WHERE Timestamp IS NOT NULL")
+        conn.execute("""
+            INSERT OR IGNORE INTO alert_runs (Timestamp, n_alerts)
+            SELECT Timestamp, COUNT(*) FROM latest_alerts WHERE Timestamp IS NOT NULL GROUP BY Timestamp
+        """)
+        conn.execute("DROP TABLE latest_alerts")
+    conn.execute(f"""
+        CREATE VIEW IF NOT EXISTS latest_alerts AS
+        SELECT {", ".join(ALERT_COLUMNS)} FROM alert_latest
+        WHERE Timestamp = (SELECT MAX(Timestamp) FROM alert_runs)
+    """)
+
+
+def setup_active_alerts(conn) -> None:
+    """Create the active_alerts table (tickers currently in an alert state, with their trigger volume)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS active_alerts (
+            Ticker TEXT PRIMARY KEY,
+            Alert_Level TEXT,
+            Trigger_Volume REAL,
+            Timestamp TEXT
+        )
+    """)
+
+
+def record_alerts(rows, run_timestamp=None, db_path=None) -> int:
+    """
+    Record one pipeline run: append its alert rows (tuples in ALERT_COLUMNS order) to the history
+    in one transaction. A run with no rows still becomes the latest run, so latest_alerts is empty.
+    """
+    rows = list(rows)
+    if run_timestamp is None:
+        run_timestamp = rows[0][-1] if rows else datetime.now().strftime(TS_FMT)
+    with transaction(db_path) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO alert_runs (Timestamp, n_alerts) VALUES (?, ?)", (run_timestamp, len(rows))
+        )
+        conn.executemany(f"""
+            INSERT INTO alert_history ({", ".join(ALERT_COLUMNS)})
+            VALUES ({", ".join("?" * len(ALERT_COLUMNS))})
+        """, rows)
+    return len(rows)
+
+
+def query_alert_history(ticker=None, level=None, start=None, end=None, limit=None, db_path=None) -> pd.DataFrame:
+    """
+    Alert rows in [start, end] (timestamps or 'YYYY-MM-DD[ HH:MM:SS]' strings), newest first,
+    optionally for one ticker and/or one alert level.
+    """
+    where, params = [], []
+    if ticker is not None:
+        where.append("Ticker = ?")
+        params.append(ticker.upper())
+    if level is not None:
+        where.append("Volume_Alert = ?")
+        params.append(level)
+    if start is not None:
+        where.append("Timestamp >= ?")
+        params.append(pd.Timestamp(start).strftime(TS_FMT))
+    if end is not None:
+        where.append("Timestamp <= ?")
+        params.append(pd.Timestamp(end).strftime(TS_FMT))
+    sql = f"SELECT {', '.join(ALERT_COLUMNS)} FROM alert_history"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY Timestamp DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return read_frame(sql, params, db_path=db_path)
+
+
+def compact_alert_history(retain_days: int = 365, compact_after_days: int = 30, db_path=None) -> int:
+    """
+    Drop history older than retain_days, and thin rows older than compact_after_days
+    to the last alert per ticker per day. Returns the number of rows removed.
+    """
+    now = datetime.now()
+    retain_cutoff = (now - timedelta(days=retain_days)).strftime(TS_FMT)
+    compact_cutoff = (now - timedelta(days=compact_after_days)).strftime(TS_FMT)
+    with transaction(db_path) as conn:
+        removed = conn.execute("DELETE FROM alert_history WHERE Timestamp < ?", (retain_cutoff,)).rowcount
+        removed += conn.execute("""
+            DELETE FROM alert_history WHERE Timestamp < ? AND id NOT IN (
+                SELECT MAX(id) FROM alert_history WHERE Timestamp < ?
+                GROUP BY Ticker, substr(Timestamp, 1, 10)
+            )
+        """, (compact_cutoff, compact_cutoff)).rowcount
+        conn.execute("DELETE FROM alert_latest WHERE Timestamp < ?", (retain_cutoff,))
+        conn.execute("DELETE FROM alert_runs WHERE Timestamp < ?", (retain_cutoff,))
+    return removed
@@ -0,0 +1,70 @@
+"""
+Shared SQLite access for alerts.db, used by the FastAPI app, the Flask
+integrated backend, the scheduler pipeline and the model code.
+
+- One resolved DB path (next to this file, or ALERTS_DB_PATH), independent of the working directory
+- One long-lived connection per thread (and per process, so forked workers don't share handles)
+- WAL journaling with a busy timeout, so API reads don't wait on the pipeline's writes
+- A larger per-connection prepared statement cache for the handful of hot queries
+"""
+
+# backend/alerts_store.py
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.abspath(os.getenv("ALERTS_DB_PATH", os.path.join(BASE_DIR, "alerts.db")))
+
+BUSY_TIMEOUT_S = 5.0
+CACHED_STATEMENTS = 256
+
+_local = threading.local()
+
+
+def _open(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_S, cached_statements=CACHED_STATEMENTS)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def get_connection(db_path: str = None) -> sqlite3.Connection:
+    """
+    Return this thread's connection to db_path (default DB_PATH), opening it on first use.
+    Use it as a context manager (`with get_connection() as conn:`) to commit or roll back;
+    that does not close it.
+    """
+    db_path = os.path.abspath(db_path or DB_PATH)
+    pool = getattr(_local, "pool", None)
+    if pool is None or getattr(_local, "pid", None) != os.getpid():
+        pool = _local.pool = {}
+        _local.pid = os.getpid()
+    conn = pool.get(db_path)
+    if conn is None:
+        conn = pool[db_path] = _open(db_path)
+    return conn
+
+
+@contextmanager
+def transaction(db_path: str = None):
+    """Run the block in one transaction on this thread's connection."""
+    conn = get_connection(db_path)
+    with conn:
+        yield conn
+
+
+def read_frame(sql: str, params=(), db_path: str = None) -> pd.DataFrame:
+    """Run a SELECT and return the result as a DataFrame."""
+    return pd.read_sql_query(sql, get_connection(db_path), params=params)
+
+
+def close_connections() -> None:
+    """Close the calling thread's connections (e.g. at worker shutdown)."""
+    pool = getattr(_local, "pool", None) or {}
+    for conn in pool.values():
+        conn.close()
+    pool.clear()
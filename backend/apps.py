@@ -1,10 +1,19 @@
 # FastAPI backend
 
-from fastapi import FastAPI, Request
-from active_model import predict_confidence, load_active_alerts
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from fastapi import FastAPI, HTTPException, Request
+from active_model import (
+    FEATURES, ConfidenceBatcher, get_registry, load_active_alerts, load_features_for_tickers,
+    predict_confidence, to_columnar,
+)
+from alerts_store import get_connection, read_frame, transaction
+from alert_history import query_alert_history, setup_active_alerts, setup_alert_history
 from fastapi.middleware.cors import CORSMiddleware # to allow requests from React frontend
 from pydantic import BaseModel
-import sqlite3
+from typing import Optional
 # from backend.notifier import send_alert_email: Is this needed?
 import pandas as pd
 
@@ -18,6 +27,13 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+class ConfidenceBatchRequest(BaseModel):
+    # Either tickers (scored on their latest alert features) or feature rows,
+    # as a list of row objects or as columns (field -> list of values)
+    tickers: Optional[list[str]] = None
+    rows: Optional[list[dict]] = None
+    columns: Optional[dict[str, list]] = None
+
 class UserPreference(BaseModel): # When a class inherits from pydantic.BaseModel, 
     # it gains the ability to automatically validate incoming data based on the type 
     # annotations provided for its attributes.
@@ -25,30 +41,64 @@ class UserPreference(BaseModel): # When a class inherits from pydantic.BaseModel
     alerts: list[str]
 
 def init_db():
-    with sqlite3.connect("backend/alerts.db") as conn:
+    with transaction() as conn:
         conn.execute("""
             CREATE TABLE IF NOT EXISTS user_prefs (
                 email TEXT PRIMARY KEY,
                 alerts TEXT
             )
         """)
+        # The confidence endpoints read alert_latest/active_alerts, which may not exist yet
+        # if the alert pipeline hasn't run against this database
+        setup_alert_history(conn)
+        setup_active_alerts(conn)
 init_db()
 
+# Load the trained confidence model once at startup; requests only run inference
+# (the scheduler retrains it, and the registry picks up new versions from disk)
+get_registry().get()
+
+# Blocking SQLite/pandas work runs on these pools instead of the event loop, so one slow
+# request doesn't stall the others. Each worker thread keeps its own pooled connection.
+# SQLite allows one writer at a time, so writes get their own single thread and can't
+# tie up the read workers while waiting on the write lock.
+blocking_pool = ThreadPoolExecutor(max_workers=int(os.getenv("API_BLOCKING_WORKERS", "8")), thread_name_prefix="api-blocking")
+write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-write")
+
+async def run_blocking(fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(blocking_pool, partial(fn, *args, **kwargs))
+
+async def run_write(fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(write_pool, partial(fn, *args, **kwargs))
+
+@app.on_event("shutdown")
+def shutdown_blocking_pools():
+    blocking_pool.shutdown(wait=False)
+    write_pool.shutdown(wait=False)
+
 # Auto-generates a database (file in directory is alerts.db) to store user preferences for email alerts.
 
+def _save_preferences(email, alerts_str):
+    with transaction() as conn: # this thread's pooled connection to alerts.db (next to this file)
+        conn.execute("REPLACE INTO user_prefs (email, alerts) VALUES (?, ?)", (email, alerts_str))
+        # (Stores email + selected alert levels)
+
 @app.post("/preferences") # (Dropdown menu? Or separate url path?) 
 async def save_preferences(pref: UserPreference): # Tells FastAPI what to do when a POST request is recieved
     # UserPreference parses the incoming JSON body from React frontend into an object in Python (defined earlier)
     alerts_str = ",".join(pref.alerts) # joins list into single string so it can be stored more easily
-    with sqlite3.connect("backend/alerts.db") as conn: # connects to SQLite database file, alerts.db (in this directory)
-        conn.execute("REPLACE INTO user_prefs (email, alerts) VALUES (?, ?)", (pref.email, alerts_str)) # Inserts or updates user preference
-        # (Stores email + selected alert levels)
+    await run_write(_save_preferences, pref.email, alerts_str) # Inserts or updates user preference
     return {"status": "ok", "message": f"Preferences saved for {pref.email}"} # Confirms to frontend that user preferences are saved
 
+def _fetch_one(sql, params=()):
+    return get_connection().execute(sql, params).fetchone()
+
+def _fetch_all(sql, params=()):
+    return get_connection().execute(sql, params).fetchall()
+
 @app.get("/preferences/{email}") # GET request to retrieve user preferences based on email
 async def get_preferences(email: str):
-    with sqlite3.connect("backend/alerts.db") as conn:
-        row = conn.execute("SELECT alerts FROM user_prefs WHERE email=?", (email,)).fetchone()
+    row = await run_blocking(_fetch_one, "SELECT alerts FROM user_prefs WHERE email=?", (email,))
     if row:
         return {"email": email, "alerts": row[0].split(",")}
     else:
@@ -56,20 +106,62 @@ async def get_preferences(email: str):
     
 @app.get("/latest-alerts") # Uses latest_alerts table in alerts.db
 async def latest_alerts():
-    conn = sqlite3.connect("backend/alerts.db")
-    rows = conn.execute("SELECT Ticker, Close, Volume, volume_z, Volume_Ratio, Volume_Alert, RSI, Timestamp FROM latest_alerts").fetchall()
-    conn.close()
+    rows = await run_blocking(_fetch_all, "SELECT Ticker, Close, Volume, volume_z, Volume_Ratio, Volume_Alert, RSI, Timestamp FROM latest_alerts")
     return [{"Ticker": r[0], "Close": r[1], "Volume": r[2], "volume_z": r[3], "Volume_Ratio": r[4], "Volume_Alert": r[5], "RSI": r[6], "Timestamp": r[7]} for r in rows]
 
 @app.get("/api/active_alerts")
 def get_active_alerts():
-    conn = sqlite3.connect("backend/alerts.db")
-    df = pd.read_sql("SELECT * FROM active_alerts", conn)
-    conn.close()
+    df = read_frame("SELECT * FROM active_alerts")
+    return df.to_dict(orient="records")
+
+@app.get("/alerts/history") # Range query over alert_history, e.g. ?ticker=GME&start=2025-01-01
+def get_alert_history(ticker: str = None, level: str = None, start: str = None, end: str = None, limit: int = 1000):
+    try:
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid start/end date: {e}")
+    df = query_alert_history(ticker=ticker, level=level, start=start, end=end, limit=limit)
     return df.to_dict(orient="records")
 
 @app.get("/confidence")
 async def get_confidence():
-    df = load_active_alerts()
-    df_conf = predict_confidence(df)
-    return df_conf.to_dict(orient="records")
+    df = await run_blocking(load_active_alerts)
+    try:
+        df_conf = await run_blocking(predict_confidence, df)
+    except LookupError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    # Rows with missing features score NaN, which JSON can't carry; send null like /confidence/batch
+    return [
+        {"Ticker": t, "Confidence": None if pd.isna(c) else float(c)}
+        for t, c in zip(df_conf["Ticker"], df_conf["Confidence"])
+    ]
+
+# Concurrent batch requests are merged into one matrix op by the micro-batcher
+confidence_batcher = ConfidenceBatcher()
+
+@app.post("/confidence/batch")
+async def get_confidence_batch(req: ConfidenceBatchRequest):
+    try:
+        if req.tickers is not None:
+            df = await run_blocking(load_features_for_tickers, req.tickers)
+        elif req.columns is not None:
+            df = pd.DataFrame(req.columns)  # columns of different lengths raise ValueError
+        else:
+            df = pd.DataFrame(req.rows or [])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid feature columns: {e}")
+    if df.empty:
+        return to_columnar([], [], get_registry().version)
+    missing = [c for c in ["Ticker"] + FEATURES if c not in df.columns]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"Missing fields: {', '.join(missing)}")
+    try:
+        X = df[FEATURES].to_numpy(dtype=float)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Feature values must be numeric: {e}")
+    try:
+        probs = await confidence_batcher.score(X)
+    except LookupError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return to_columnar(df["Ticker"], probs, get_registry().version)
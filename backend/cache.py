@@ -0,0 +1,159 @@
+"""
+In-process response cache used by integrated_backend.py.
+
+- Per-key TTLs: entries are fresh for `ttl` seconds
+- Stale-while-revalidate: for a further `stale_ttl` seconds the old value is
+  returned immediately and one background refresh is started
+- Single-flight: concurrent misses on the same key wait for one computation
+  instead of each redoing the work
+- LRU bound on the number of keys, plus hit/miss counters for /api/stats
+"""
+
+# backend/cache.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """One in-progress computation that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    def __init__(self, default_ttl: float = 60.0, stale_ttl: float = 0.0, max_entries: int = 1024):
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, fresh_until, stale_until)
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "errors": 0}
+
+    def _store(self, key, value, ttl: float, stale_ttl: float) -> None:
+        now = time.monotonic()
+        self._entries[key] = (value, now + ttl, now + ttl + stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, stale_ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._store(key, value, self.default_ttl if ttl is None else ttl, self.stale_ttl if stale_ttl is None else stale_ttl)
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Current value for key, fresh or stale, without computing or counting (a hit still counts as a use for LRU)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() >= entry[2]:
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _run_flight(self, key, flight: _Flight, compute: Callable[[], Any], ttl: float, stale_ttl: float) -> None:
+        try:
+            value = compute()
+        except Exception as e:
+            logger.warning(f"Cache compute for {key!r} failed: {e}")
+            flight.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+        else:
+            flight.value = value
+            with self._lock:
+                self._store(key, value, ttl, stale_ttl)
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _join_or_start(self, key, compute, ttl, stale_ttl, background: bool):
+        """Caller holds the lock. Returns (flight, started_here)."""
+        flight = self._flights.get(key)
+        if flight is not None:
+            return flight, False
+        flight = self._flights[key] = _Flight()
+        if background:
+            self._stats["refreshes"] += 1
+            threading.Thread(
+                target=self._run_flight, args=(key, flight, compute, ttl, stale_ttl),
+                name=f"cache-refresh-{key}", daemon=True,
+            ).start()
+        return flight, True
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+    ) -> Any:
+        """
+        Return the cached value for key, computing it with compute() on a miss.
+        Stale values are served while one background refresh runs; concurrent misses share one compute().
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry is not None and now < entry[1]:
+                self._stats["hits"] += 1
+                self._entries.move_to_end(key)
+                return entry[0]
+            if entry is not None and now < entry[2]:
+                self._stats["stale_hits"] += 1
+                self._join_or_start(key, compute, ttl, stale_ttl, background=True)
+                return entry[0]
+            flight, started = self._join_or_start(key, compute, ttl, stale_ttl, background=False)
+            self._stats["misses" if started else "coalesced"] += 1
+        if started:
+            self._run_flight(key, flight, compute, ttl, stale_ttl)
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def refresh(self, key: Hashable, compute: Callable[[], Any], ttl: Optional[float] = None,
+                stale_ttl: Optional[float] = None, wait: bool = True) -> Any:
+        """
+        Recompute key now (joining a refresh already in flight). With wait=False the refresh runs
+        in the background and the current value (or None) is returned.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+        with self._lock:
+            flight, started = self._join_or_start(key, compute, ttl, stale_ttl, background=not wait)
+            if not started:
+                self._stats["coalesced"] += 1
+        if not wait:
+            return self.peek(key)
+        if started:
+            self._run_flight(key, flight, compute, ttl, stale_ttl)
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["entries"] = len(self._entries)
+            out["in_flight"] = len(self._flights)
+        lookups = out["hits"] + out["stale_hits"] + out["misses"] + out["coalesced"]
+        out["hit_ratio"] = round((out["hits"] + out["stale_hits"]) / lookups, 4) if lookups else None
+        return out
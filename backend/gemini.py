@@ -3,68 +3,31 @@ Backend module integrating Google Gemini for stock analysis and recommendations
 """
 
 import os
-import pandas as pd
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 
 # use latest_alerts table from stock_analysis.py
 from stock_data_scraping import fetch_stock_data
+from sentiment_cache import PostSentimentCache
 
-
-def parse_gemini_csv_manual(raw_text):
-    raw_text = raw_text.strip()
-    lines = raw_text.splitlines()
-
-    start_idx = None
-    for i, line in enumerate(lines):
-        if line.strip().startswith("ticker,sentiment,sentiment_score"):
-            start_idx = i
-            break
-
-    if start_idx is None:
-        print("No valid header found in Gemini output")
-        return pd.DataFrame(columns=["ticker", "sentiment", "sentiment_score"])
-
-    data = []
-    for line in lines[start_idx + 1:]:
-        if not line.strip():
-            continue
-        parts = line.split(",")
-        if len(parts) != 3:
-            continue
-        ticker, sentiment, score = parts
-        try:
-            score = float(score)
-        except ValueError:
-            score = None
-        data.append({
-            "ticker": ticker.strip(),
-            "sentiment": sentiment.strip(),
-            "sentiment_score": score
-        })
-
-    return pd.DataFrame(data)
+# Per-post results, shared across calls and persisted in alerts.db
+sentiment_cache = PostSentimentCache()
 
 
 def analyze_sentiment(client, posts):
-    prompt = f"""
-    Analyze the sentiment for each of the Reddit posts in the dataframe.
-    Return the results as CSV text with headers: ticker, sentiment, sentiment_score (-1 to +1).
-
-    Posts:
-    {posts}
-    """
-
-    response = client.models.generate_content(
-        model="gemini-2.5-pro",
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            tools=[types.Tool(google_search=types.GoogleSearch())]
+    # Only posts that aren't in the per-post cache yet are sent to Gemini
+    def generate(prompt):
+        response = client.models.generate_content(
+            model="gemini-2.5-pro",
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                tools=[types.Tool(google_search=types.GoogleSearch())]
+            )
         )
-    )
+        return response.text
 
-    return parse_gemini_csv_manual(response.text)
+    return sentiment_cache.analyze(posts, generate)
 
 def summarize_market(client, df):
     summary_prompt = f"""
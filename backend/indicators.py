@@ -0,0 +1,265 @@
+"""
+Vectorized indicator engine shared by stock_analysis.py and integrated_backend.py.
+
+Long-format frames (one row per ticker per bar) are packed into a
+ticker x time matrix, right-aligned so every ticker's latest bar is in
+the last column and shorter histories are NaN-padded on the left. Rolling
+mean/std, volume ratio and Wilder RSI are then computed for all tickers
+at once with NumPy array ops instead of a Python lambda per ticker.
+"""
+
+# backend/indicators.py
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+def to_matrix(df: pd.DataFrame, column: str, ticker_col: str = "Ticker"):
+    """
+    Pack df[column] into a right-aligned (n_tickers, max_len) float matrix.
+    Rows keep each ticker's bars in frame order. Returns (matrix, (rows, cols), tickers) where
+    rows/cols map every frame row to its matrix cell, for scattering results back.
+    """
+    codes, tickers = pd.factorize(df[ticker_col], sort=False)
+    n = len(tickers)
+    pos = df.groupby(codes, sort=False).cumcount().to_numpy()
+    lengths = np.bincount(codes, minlength=n)
+    width = int(lengths.max()) if n else 0
+    cols = pos + (width - lengths[codes])
+    mat = np.full((n, width), np.nan)
+    mat[codes, cols] = df[column].to_numpy(dtype=float)
+    return mat, (codes, cols), list(tickers)
+
+
+def from_matrix(mat: np.ndarray, index) -> np.ndarray:
+    """Gather matrix values back into frame row order (inverse of to_matrix)."""
+    rows, cols = index
+    return mat[rows, cols]
+
+
+def _window_sum(x: np.ndarray, window: int) -> np.ndarray:
+    c = np.cumsum(x, axis=1)
+    out = c.copy()
+    out[:, window:] = c[:, window:] - c[:, :-window]
+    return out
+
+
+def rolling_mean_std(mat: np.ndarray, window: int, min_periods: int = None):
+    """
+    Rolling mean and sample std (ddof=1) along time for every row, ignoring NaNs like pandas
+    rolling(window, min_periods). Values are centered per row first to keep the sum-of-squares stable.
+    """
+    if min_periods is None:
+        min_periods = window
+    valid = ~np.isnan(mat)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        center = np.nanmean(np.where(valid, mat, np.nan), axis=1, keepdims=True) if mat.size else mat
+        center = np.nan_to_num(center)
+        x = np.where(valid, mat - center, 0.0)
+        n = _window_sum(valid.astype(float), window)
+        s = _window_sum(x, window)
+        ss = _window_sum(x * x, window)
+        mean = s / n
+        var = (ss - s * s / n) / (n - 1)
+    var = np.maximum(var, 0.0)
+    mean = np.where(n >= max(min_periods, 1), mean + center, np.nan)
+    std = np.where(n >= max(min_periods, 2), np.sqrt(var), np.nan)
+    return mean, std
+
+
+def rolling_zscore(mat: np.ndarray, window: int = 50, min_periods: int = None):
+    """(x - rolling mean) / rolling std per row; also returns the mean and std."""
+    mean, std = rolling_mean_std(mat, window, min_periods)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (mat - mean) / std
+    z[np.isinf(z)] = np.nan
+    return z, mean, std
+
+
+def volume_ratio(mat: np.ndarray) -> np.ndarray:
+    """Each bar's value divided by its row's mean over all bars."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return mat / np.nanmean(mat, axis=1, keepdims=True)
+
+
+def latest_volume_ratio(mat: np.ndarray) -> np.ndarray:
+    """Latest bar vs mean of all earlier bars per row (1.0 when undefined)."""
+    if mat.shape[1] < 2:
+        return np.ones(mat.shape[0])
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # rows with a single bar have no earlier bars
+        avg = np.nanmean(mat[:, :-1], axis=1)
+        ratio = mat[:, -1] / avg
+    return np.where(np.isfinite(ratio) & (avg != 0), ratio, 1.0)
+
+
+def wilder_rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    Wilder RSI per row, matching ta.momentum.RSIIndicator: gains/losses smoothed with
+    ewm(alpha=1/window, adjust=False), NaN until window observations, 100 when there are no losses.
+    The recursion runs over time once, vectorized across all tickers.
+    """
+    n_rows, width = close.shape
+    out = np.full((n_rows, width), np.nan)
+    if width == 0:
+        return out
+    alpha = 1.0 / window
+    started = np.zeros(n_rows, dtype=bool)
+    count = np.zeros(n_rows)
+    ema_up = np.zeros(n_rows)
+    ema_dn = np.zeros(n_rows)
+    prev = np.full(n_rows, np.nan)
+    for t in range(width):
+        cur = close[:, t]
+        started |= ~np.isnan(cur)
+        diff = cur - prev
+        up = np.where(diff > 0, diff, 0.0)
+        dn = np.where(diff < 0, -diff, 0.0)
+        first = started & (count == 0)
+        ema_up = np.where(first, up, np.where(started, (1 - alpha) * ema_up + alpha * up, ema_up))
+        ema_dn = np.where(first, dn, np.where(started, (1 - alpha) * ema_dn + alpha * dn, ema_dn))
+        count += started
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rsi = np.where(ema_dn == 0, 100.0, 100.0 - 100.0 / (1.0 + ema_up / ema_dn))
+        out[:, t] = np.where(count >= window, rsi, np.nan)
+        prev = cur
+    return out
+
+
+def compute_indicators(
+    df: pd.DataFrame,
+    z_window: int = 50,
+    z_min_periods: int = None,
+    rsi_window: int = 14,
+    ticker_col: str = "Ticker",
+) -> pd.DataFrame:
+    """
+    Add volume_mean, volume_std, volume_z, Volume_Ratio and RSI columns to a long-format
+    frame (rows of each ticker in time order) in one pass over all tickers.
+    """
+    if df.empty:
+        return df
+    vol, index, _ = to_matrix(df, "Volume", ticker_col)
+    close, _, _ = to_matrix(df, "Close", ticker_col)
+    z, mean, std = rolling_zscore(vol, z_window, z_min_periods)
+    df["volume_mean"] = from_matrix(mean, index)
+    df["volume_std"] = from_matrix(std, index)
+    df["volume_z"] = from_matrix(z, index)
+    df["Volume_Ratio"] = from_matrix(volume_ratio(vol), index)
+    df["RSI"] = from_matrix(wilder_rsi(close, rsi_window), index)
+    return df
+
+
+class IndicatorState:
+    """
+    Online per-ticker indicator state, advanced one bar at a time in O(1):
+    - rolling volume mean/variance over a ring buffer of the last `window` bars (sliding Welford update)
+    - volume ratio against the running mean of every bar seen
+    - Wilder-smoothed average gain/loss for RSI
+    volume_z and RSI match compute_indicators over the same bars (Volume_Ratio matches on the
+    latest bar). Round-trips through to_dict()/from_dict() so it can be persisted between runs.
+    """
+
+    def __init__(self, window: int = 50, rsi_window: int = 14, min_periods: int = None):
+        self.window = window
+        self.rsi_window = rsi_window
+        self.min_periods = window if min_periods is None else min_periods
+        self.buf = []  # ring buffer of the last `window` volumes
+        self.head = 0  # index of the oldest value once the buffer is full
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.total_n = 0
+        self.total_mean = 0.0
+        self.prev_close = None
+        self.rsi_n = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.last_date = None
+
+    def _push_volume(self, x: float) -> None:
+        if len(self.buf) < self.window:
+            self.buf.append(x)
+            n = len(self.buf)
+            delta = x - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+            return
+        old = self.buf[self.head]
+        self.buf[self.head] = x
+        self.head = (self.head + 1) % self.window
+        old_mean = self.mean
+        self.mean += (x - old) / self.window
+        self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        self.m2 = max(self.m2, 0.0)
+
+    def update(self, close: float, volume: float, date=None) -> dict:
+        """Advance by one bar and return its indicator values."""
+        volume = float(volume)
+        self._push_volume(volume)
+        n = len(self.buf)
+        mean = self.mean if n >= max(self.min_periods, 1) else np.nan
+        std = np.sqrt(self.m2 / (n - 1)) if n >= max(self.min_periods, 2) else np.nan
+        z = (volume - mean) / std if std and np.isfinite(std) else np.nan
+
+        self.total_n += 1
+        self.total_mean += (volume - self.total_mean) / self.total_n
+        ratio = volume / self.total_mean if self.total_mean else np.nan
+
+        close = float(close)
+        if self.prev_close is None:
+            gain = loss = 0.0
+        else:
+            diff = close - self.prev_close
+            gain, loss = max(diff, 0.0), max(-diff, 0.0)
+        alpha = 1.0 / self.rsi_window
+        if self.rsi_n == 0:
+            self.avg_gain, self.avg_loss = gain, loss
+        else:
+            self.avg_gain = (1 - alpha) * self.avg_gain + alpha * gain
+            self.avg_loss = (1 - alpha) * self.avg_loss + alpha * loss
+        self.rsi_n += 1
+        self.prev_close = close
+        if self.rsi_n < self.rsi_window:
+            rsi = np.nan
+        elif self.avg_loss == 0:
+            rsi = 100.0
+        else:
+            rsi = 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+
+        if date is not None:
+            self.last_date = str(date)
+        return {
+            "volume_mean": mean,
+            "volume_std": std,
+            "volume_z": z,
+            "Volume_Ratio": ratio,
+            "RSI": rsi,
+        }
+
+    def peek(self, close: float, volume: float) -> dict:
+        """Indicator values for a bar without advancing the state (e.g. a still-forming bar)."""
+        return self.copy().update(close, volume)
+
+    def copy(self) -> "IndicatorState":
+        return IndicatorState.from_dict(self.to_dict())
+
+    def to_dict(self) -> dict:
+        # Store the ring buffer oldest-first so the head offset doesn't need persisting
+        ordered = self.buf[self.head:] + self.buf[:self.head]
+        return {
+            "window": self.window, "rsi_window": self.rsi_window, "min_periods": self.min_periods,
+            "buf": ordered, "mean": self.mean, "m2": self.m2,
+            "total_n": self.total_n, "total_mean": self.total_mean,
+            "prev_close": self.prev_close, "rsi_n": self.rsi_n,
+            "avg_gain": self.avg_gain, "avg_loss": self.avg_loss, "last_date": self.last_date,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "IndicatorState":
+        st = cls(d["window"], d["rsi_window"], d["min_periods"])
+        st.buf = list(d["buf"])
+        st.head = 0
+        for k in ("mean", "m2", "total_n", "total_mean", "prev_close", "rsi_n", "avg_gain", "avg_loss", "last_date"):
+            setattr(st, k, d[k])
+        return st
@@ -5,12 +5,14 @@ Combines: Volume Analysis + Sentiment Analysis + Real-time Data
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import google.generativeai as genai
+import hashlib
 import json
+import math
 import os
+import threading
 from datetime import datetime, timedelta
 import logging
 from typing import List, Dict
@@ -41,10 +43,24 @@ except Exception as e:
     logger.error(f"Error configuring Gemini API: {e}")
     api_keys = None
 
+from stock_data_scraping import fetch_stock_data as fetch_ohlcv
+from indicators import latest_volume_ratio, rolling_zscore, to_matrix, wilder_rsi
+from alerts_store import get_connection
+from cache import TTLCache
+from refresh_worker import RefreshWorker
+from sentiment_cache import PostSentimentCache
+
 # Configuration
 LOOKBACK_DAYS = 50  # For volume calculations
 SENTIMENT_LOOKBACK = 3  # Days for sentiment analysis
 REFRESH_INTERVAL = 1800  # seconds (30 minutes - matches scheduler)
+DB_ALERTS_TTL = 30  # seconds to reuse alerts read from alerts.db
+SENTIMENT_TTL = 300  # seconds (5 minutes) to reuse Gemini sentiment and preserve API quota
+FETCH_CHUNK_SIZE = 25  # tickers per batched fetch
+GEMINI_MIN_INTERVAL = 6.0  # seconds between Gemini requests (10 requests/minute)
+ADVICE_BATCH_SIZE = 20  # tickers per batched advice prompt
+ADVICE_CACHE_TTL = 6 * 3600  # seconds to reuse advice for the same bucketed inputs
+ADVICE_CACHE_SIZE = 2048  # advice entries kept (least recently used evicted first)
 
 # Monitored stock tickers
 TARGET_TICKERS = ["GME", "AMC", "BB", "TSLA", "NVDA", "PLTR", "NOK", "AAPL", "MSFT"]
@@ -110,31 +126,84 @@ class VolumeAnalyzer:
     
     @staticmethod
     def fetch_stock_data(ticker: str, days: int = 50) -> pd.DataFrame:
-        """Fetch stock data with volume information"""
+        """Fetch stock data with volume information (served from the local OHLCV store, topped up from yfinance)"""
         try:
-            df = yf.download(ticker, period=f"{days}d", interval="1d", progress=False)
+            df = fetch_ohlcv([ticker], days)
             if df.empty:
                 logger.warning(f"No data for {ticker}, using mock data")
                 return VolumeAnalyzer.generate_mock_data(ticker, days)
             
-            df['Ticker'] = ticker
-            return df
+            return df.set_index('Date')
         except Exception as e:
             logger.error(f"Error fetching {ticker}: {e}, using mock data")
             return VolumeAnalyzer.generate_mock_data(ticker, days)
     
+    @staticmethod
+    def fetch_many(tickers: List[str], days: int = 50, chunk_size: int = FETCH_CHUNK_SIZE) -> pd.DataFrame:
+        """
+        Fetch many tickers as one long frame (Date, Open..Volume, Ticker). One fetch call downloads
+        them chunk_size tickers per batched download, one chunk at a time (yfinance parallelizes
+        inside each download, and concurrent downloads are unsafe); tickers that come back empty
+        get mock data, as in fetch_stock_data.
+        """
+        frames = []
+        if tickers:
+            try:
+                data = fetch_ohlcv(list(tickers), days, chunk_size=chunk_size)
+                if not data.empty:
+                    frames.append(data)
+            except Exception as e:
+                logger.error(f"Error fetching {len(tickers)} tickers: {e}, using mock data")
+        found = set(frames[0]['Ticker']) if frames else set()
+        for ticker in tickers:
+            if ticker not in found:
+                logger.warning(f"No data for {ticker}, using mock data")
+                mock = VolumeAnalyzer.generate_mock_data(ticker, days)
+                frames.append(mock.rename_axis('Date').reset_index())
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+    
+    @staticmethod
+    def analyze_many(data: pd.DataFrame, z_window: int = 50, rsi_period: int = 14) -> Dict[str, Dict]:
+        """
+        Latest-bar metrics for every ticker in a long frame, computed for all tickers at once on
+        the indicator engine's ticker x time matrices. Same rules as the per-ticker methods:
+        volume_z needs z_window bars (else 0), RSI needs rsi_period + 1 bars (else 50).
+        """
+        if data.empty:
+            return {}
+        vol, (rows, _), tickers = to_matrix(data, 'Volume')
+        close, _, _ = to_matrix(data, 'Close')
+        lengths = np.bincount(rows, minlength=len(tickers))
+        z, _, _ = rolling_zscore(vol, window=z_window, min_periods=1)
+        rsi = wilder_rsi(close, window=rsi_period)
+        ratio = latest_volume_ratio(vol)
+        metrics = {}
+        for i, ticker in enumerate(tickers):
+            n = lengths[i]
+            last_rsi = rsi[i, -1]
+            current_price = float(close[i, -1])
+            metrics[ticker] = {
+                'volume_z': z[i, -1] if n >= z_window else 0,
+                'volume_ratio': float(ratio[i]) if n >= 2 else 1.0,
+                'rsi': float(last_rsi) if n >= rsi_period + 1 and not np.isnan(last_rsi) else 50.0,
+                'current_price': current_price,
+                'prev_close': float(close[i, -2]) if n > 1 else current_price,
+            }
+        return metrics
+    
     @staticmethod
     def calculate_volume_zscore(df: pd.DataFrame) -> pd.DataFrame:
         """Calculate rolling z-score for volume"""
         if df.empty or len(df) < 50:
             return df
         
-        # Calculate 50-day rolling mean and std
-        df['volume_mean'] = df['Volume'].rolling(window=50, min_periods=1).mean()
-        df['volume_std'] = df['Volume'].rolling(window=50, min_periods=1).std()
-        
-        # Calculate z-score
-        df['volume_z'] = (df['Volume'] - df['volume_mean']) / df['volume_std']
+        # 50-day rolling mean/std and z-score via the shared indicator engine
+        z, mean, std = rolling_zscore(df['Volume'].to_numpy(dtype=float)[None, :], window=50, min_periods=1)
+        df['volume_mean'] = mean[0]
+        df['volume_std'] = std[0]
+        df['volume_z'] = z[0]
         
         return df
     
@@ -158,42 +227,31 @@ class VolumeAnalyzer:
         if df.empty or len(df) < 2:
             return 1.0
         
-        avg_volume = df['Volume'].iloc[:-1].mean()
-        latest_volume = df['Volume'].iloc[-1]
-        
-        if avg_volume == 0:
-            return 1.0
-        
-        return latest_volume / avg_volume
+        return float(latest_volume_ratio(df['Volume'].to_numpy(dtype=float)[None, :])[0])
     
     @staticmethod
     def calculate_rsi(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
-        """Calculate RSI (Relative Strength Index)"""
+        """Calculate RSI (Relative Strength Index, Wilder smoothing via the shared indicator engine)"""
         if df.empty or len(df) < period + 1:
             df['RSI'] = 50.0  # Neutral RSI if not enough data
             return df
         
-        # Calculate price changes
-        delta = df['Close'].diff()
-        
-        # Separate gains and losses
-        gain = (delta.where(delta > 0, 0)).rolling(window=period, min_periods=1).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period, min_periods=1).mean()
-        
-        # Calculate RS and RSI
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        df['RSI'] = rsi.fillna(50.0)  # Fill NaN with neutral value
+        rsi = wilder_rsi(df['Close'].to_numpy(dtype=float)[None, :], window=period)[0]
+        df['RSI'] = pd.Series(rsi, index=df.index).fillna(50.0)  # Fill NaN with neutral value
         return df
 
 
 class SentimentAnalyzer:
     """Handles sentiment analysis using Gemini AI"""
     
-    def __init__(self):
-        self.model = None
-        if api_keys:
+    def __init__(self, model=None, advice_cache: TTLCache = None, sentiment_cache: PostSentimentCache = None):
+        # model: anything with generate_content(prompt) -> response with .text (injectable for tests)
+        self.model = model
+        self.advice_cache = advice_cache or TTLCache(default_ttl=ADVICE_CACHE_TTL, max_entries=ADVICE_CACHE_SIZE)
+        self.sentiment_cache = sentiment_cache or PostSentimentCache()
+        self._call_lock = threading.Lock()
+        self._last_call = 0.0
+        if self.model is None and api_keys:
             try:
                 self.model = genai.GenerativeModel("gemini-2.0-flash-exp")
                 logger.info("Gemini model initialized")
@@ -244,106 +302,170 @@ class SentimentAnalyzer:
             return pd.DataFrame(columns=["ticker", "sentiment", "sentiment_score"])
     
     def analyze_sentiment(self, posts: List[str]) -> pd.DataFrame:
-        """Analyze sentiment of posts using Gemini"""
+        """
+        Analyze sentiment of posts using Gemini. Per-post results are cached by content hash
+        (see sentiment_cache.py), so only new or edited posts are sent to the model.
+        """
         if not self.model:
-            logger.warning("Gemini model not available, returning neutral sentiment")
-            return pd.DataFrame(columns=["ticker", "sentiment", "sentiment_score"])
+            logger.warning("Gemini model not available, using cached sentiment only")
         
         try:
-            prompt = f"""
-            Analyze the sentiment for each stock ticker mentioned in these social media posts.
-            Return ONLY a CSV format with headers: ticker,sentiment,sentiment_score
-            
-            Rules:
-            - sentiment should be: bullish, bearish, or neutral
-            - sentiment_score should be a number from -1 (very bearish) to +1 (very bullish)
-            - Only include tickers that are explicitly mentioned
-            - One line per ticker
-            
-            Posts:
-            {chr(10).join(posts)}
-            
-            Example output format:
-            ticker,sentiment,sentiment_score
-            GME,bullish,0.8
-            AMC,neutral,0.1
-            """
-            
-            response = self.model.generate_content(prompt)
-            return self.parse_gemini_response(response.text)
+            return self.sentiment_cache.analyze(posts, self._generate if self.model else None)
         
         except Exception as e:
             logger.error(f"Error in sentiment analysis: {e}")
             return pd.DataFrame(columns=["ticker", "sentiment", "sentiment_score"])
     
+    def _generate(self, prompt: str) -> str:
+        """Call the model, spacing calls GEMINI_MIN_INTERVAL apart to stay under the API rate limit"""
+        with self._call_lock:
+            wait = self._last_call + GEMINI_MIN_INTERVAL - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_call = time.monotonic()
+        return self.model.generate_content(prompt).text
+    
+    @staticmethod
+    def advice_key(ticker: str, price: float, price_change: float,
+                   volume_ratio: float, sentiment_score: float) -> str:
+        """
+        Content address for advice: hash of the inputs rounded into buckets (price in ~2% log steps,
+        price change to 1%, volume ratio to 0.25x, sentiment to 0.1), so near-identical refreshes reuse advice.
+        """
+        buckets = [
+            ticker.upper(),
+            int(round(math.log(price) / math.log(1.02))) if price and price > 0 else 0,
+            int(round(price_change)),
+            round(volume_ratio * 4) / 4,
+            round(sentiment_score, 1),
+        ]
+        return hashlib.sha256(json.dumps(buckets).encode()).hexdigest()
+    
+    @staticmethod
+    def parse_advice_batch(raw_text: str) -> Dict[str, str]:
+        """Parse a batched advice response: a JSON object ticker -> advice, or 'TICKER: advice' lines"""
+        text = raw_text.strip()
+        brace_start, brace_end = text.find('{'), text.rfind('}')
+        if brace_start != -1 and brace_end > brace_start:
+            try:
+                parsed = json.loads(text[brace_start:brace_end + 1])
+                return {str(t).upper(): str(a).strip() for t, a in parsed.items() if str(a).strip()}
+            except (ValueError, AttributeError):
+                pass
+        advice = {}
+        for line in text.splitlines():
+            ticker, sep, rest = line.strip().lstrip('-*').partition(':')
+            ticker = ticker.strip().strip('*').upper()
+            if sep and rest.strip() and ticker.isalpha() and len(ticker) <= 5:
+                advice[ticker] = rest.strip()
+        return advice
+    
+    def _advice_batch_prompt(self, items: List[Dict]) -> str:
+        lines = "\n".join(
+            f"- {it['ticker']}: price ${it['price']:.2f}, change {it['price_change']:+.2f}%, "
+            f"volume ratio {it['volume_ratio']:.2f}x, sentiment {it['sentiment_score']:+.2f}"
+            for it in items
+        )
+        return f"""
+            You are a financial advisor AI. Provide brief, actionable investment advice for each stock below.
+            Volume ratio is current volume vs average (high means unusual trading activity);
+            sentiment is from -1 (bearish) to +1 (bullish).
+            
+            {lines}
+            
+            For each stock give 2-3 sentences considering the unusual volume activity, price momentum
+            and sentiment, and risk factors for meme stocks. Keep it concise and professional.
+            Do not include disclaimers.
+            Return ONLY a JSON object mapping each ticker to its advice, e.g. {{"GME": "...", "AMC": "..."}}
+            """
+    
+    def generate_advice_batch(self, items: List[Dict]) -> Dict[str, str]:
+        """
+        Advice for many stocks. items are dicts with ticker, price, price_change, volume_ratio and
+        sentiment_score. Cached advice (by advice_key) is reused; the rest is requested from the
+        model ADVICE_BATCH_SIZE tickers per prompt. Anything the model doesn't return gets
+        rule-based advice, which is not cached so the next refresh asks the model again.
+        """
+        results = {}
+        pending = []
+        for it in items:
+            key = self.advice_key(it['ticker'], it['price'], it['price_change'], it['volume_ratio'], it['sentiment_score'])
+            cached = self.advice_cache.peek(key)
+            if cached is not None:
+                results[it['ticker']] = cached
+            else:
+                pending.append((key, it))
+        if pending and self.model:
+            for i in range(0, len(pending), ADVICE_BATCH_SIZE):
+                chunk = pending[i:i + ADVICE_BATCH_SIZE]
+                try:
+                    parsed = self.parse_advice_batch(self._generate(self._advice_batch_prompt([it for _, it in chunk])))
+                except Exception as e:
+                    logger.warning(f"Could not generate AI advice for {len(chunk)} tickers: {e}")
+                    parsed = {}
+                for key, it in chunk:
+                    advice = parsed.get(it['ticker'].upper())
+                    if advice:
+                        self.advice_cache.set(key, advice)
+                        results[it['ticker']] = advice
+        for it in items:
+            if it['ticker'] not in results:
+                results[it['ticker']] = self.rule_based_advice(
+                    it['ticker'], it['price_change'], it['volume_ratio'], it['sentiment_score']
+                )
+        return results
+    
     def generate_stock_advice(self, ticker: str, price: float, price_change: float, 
                               volume_ratio: float, sentiment_score: float) -> str:
-        """Generate investment advice for a specific stock using Gemini"""
+        """Generate investment advice for a specific stock using Gemini (cached, see generate_advice_batch)"""
         if not self.model:
             return "AI analysis unavailable. Please check system configuration."
         
-        try:
-            prompt = f"""
-            You are a financial advisor AI. Provide brief, actionable investment advice for the following stock:
-            
-            Ticker: {ticker}
-            Current Price: ${price:.2f}
-            Price Change: {price_change:+.2f}%
-            Volume Ratio: {volume_ratio:.2f}x (current volume vs average)
-            Sentiment Score: {sentiment_score:.2f} (from -1 bearish to +1 bullish)
-            
-            Provide advice in 2-3 sentences. Consider:
-            - The unusual volume activity (high volume ratio indicates unusual trading activity)
-            - Price momentum and sentiment
-            - Risk factors for meme stocks
-            
-            Keep it concise and professional. Do not include disclaimers.
-            """
-            
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+        item = {'ticker': ticker, 'price': price, 'price_change': price_change,
+                'volume_ratio': volume_ratio, 'sentiment_score': sentiment_score}
+        return self.generate_advice_batch([item])[ticker]
+    
+    @staticmethod
+    def rule_based_advice(ticker: str, price_change: float, volume_ratio: float, sentiment_score: float) -> str:
+        """Enhanced rule-based advice, used when AI advice is unavailable"""
+        sentiment_desc = "bullish" if sentiment_score > 0.3 else "bearish" if sentiment_score < -0.3 else "neutral"
+        volume_desc = "extremely high" if volume_ratio > 3 else "elevated" if volume_ratio > 2 else "moderate"
         
-        except Exception as e:
-            logger.warning(f"Could not generate AI advice for {ticker}: {e}")
-            # Provide enhanced rule-based fallback advice
-            sentiment_desc = "bullish" if sentiment_score > 0.3 else "bearish" if sentiment_score < -0.3 else "neutral"
-            volume_desc = "extremely high" if volume_ratio > 3 else "elevated" if volume_ratio > 2 else "moderate"
-            
-            # Build comprehensive advice
-            advice_parts = []
-            
-            # Volume analysis
-            advice_parts.append(f"{ticker} is experiencing {volume_desc} trading volume at {volume_ratio:.1f}x the average")
-            
-            # Price movement analysis
-            if abs(price_change) > 5:
-                direction = "surging" if price_change > 0 else "declining sharply"
-                advice_parts.append(f"with the price {direction} by {abs(price_change):.1f}%")
-            elif abs(price_change) > 2:
-                direction = "rising" if price_change > 0 else "falling"
-                advice_parts.append(f"while {direction} by {abs(price_change):.1f}%")
-            else:
-                advice_parts.append(f"with relatively stable pricing ({price_change:+.1f}%)")
-            
-            # Sentiment integration
-            if abs(sentiment_score) > 0.5:
-                advice_parts.append(f"Social sentiment is strongly {sentiment_desc} ({sentiment_score:+.1f})")
-            elif abs(sentiment_score) > 0.3:
-                advice_parts.append(f"showing {sentiment_desc} sentiment ({sentiment_score:+.1f})")
-            
-            # Trading recommendation based on volume and price
-            if volume_ratio > 3 and abs(price_change) > 3:
-                recommendation = "This combination of high volume and significant price movement suggests heightened volatility. Consider waiting for stabilization before entering positions"
-            elif volume_ratio > 3:
-                recommendation = "The unusual volume spike warrants close monitoring for potential breakout or breakdown patterns"
-            elif volume_ratio > 2:
-                recommendation = "Watch for confirmation of trend direction before taking positions"
-            else:
-                recommendation = "Monitor for volume confirmation before acting"
-            
-            advice_parts.append(recommendation + ".")
-            
-            return ". ".join(advice_parts)
+        # Build comprehensive advice
+        advice_parts = []
+        
+        # Volume analysis
+        advice_parts.append(f"{ticker} is experiencing {volume_desc} trading volume at {volume_ratio:.1f}x the average")
+        
+        # Price movement analysis
+        if abs(price_change) > 5:
+            direction = "surging" if price_change > 0 else "declining sharply"
+            advice_parts.append(f"with the price {direction} by {abs(price_change):.1f}%")
+        elif abs(price_change) > 2:
+            direction = "rising" if price_change > 0 else "falling"
+            advice_parts.append(f"while {direction} by {abs(price_change):.1f}%")
+        else:
+            advice_parts.append(f"with relatively stable pricing ({price_change:+.1f}%)")
+        
+        # Sentiment integration
+        if abs(sentiment_score) > 0.5:
+            advice_parts.append(f"Social sentiment is strongly {sentiment_desc} ({sentiment_score:+.1f})")
+        elif abs(sentiment_score) > 0.3:
+            advice_parts.append(f"showing {sentiment_desc} sentiment ({sentiment_score:+.1f})")
+        
+        # Trading recommendation based on volume and price
+        if volume_ratio > 3 and abs(price_change) > 3:
+            recommendation = "This combination of high volume and significant price movement suggests heightened volatility. Consider waiting for stabilization before entering positions"
+        elif volume_ratio > 3:
+            recommendation = "The unusual volume spike warrants close monitoring for potential breakout or breakdown patterns"
+        elif volume_ratio > 2:
+            recommendation = "Watch for confirmation of trend direction before taking positions"
+        else:
+            recommendation = "Monitor for volume confirmation before acting"
+        
+        advice_parts.append(recommendation + ".")
+        
+        return ". ".join(advice_parts)
 
 
 class StockAlertSystem:
@@ -352,15 +474,17 @@ class StockAlertSystem:
     def __init__(self):
         self.volume_analyzer = VolumeAnalyzer()
         self.sentiment_analyzer = SentimentAnalyzer()
-        self.cache = {}
+        # Short-lived caches for database alerts and sentiment (concurrent misses share one computation)
+        self.cache = TTLCache(default_ttl=REFRESH_INTERVAL, stale_ttl=REFRESH_INTERVAL)
+        # Fresh alerts are generated off the request path and published as immutable snapshots
+        self.refresher = RefreshWorker(self.generate_alerts, interval=REFRESH_INTERVAL, name="alerts-refresh")
         self.last_update = None
         self.use_database = True  # Use stock_analysis.py database if available
     
     def get_alerts_from_database(self):
         """Get alerts from stock_analysis.py database if available"""
         try:
-            import sqlite3
-            with sqlite3.connect("backend/alerts.db") as conn:
+            with get_connection() as conn:
                 rows = conn.execute("""
                     SELECT Ticker, Close, Volume, volume_z, Volume_Ratio, Volume_Alert, RSI, 
                            Price_Change, Sentiment_Score, Mention_Count, Timestamp 
@@ -431,76 +555,81 @@ class StockAlertSystem:
         return ". ".join(advice_parts)
     
     def get_alerts(self, force_refresh: bool = False) -> List[Dict]:
-        """Generate stock alerts combining volume and sentiment"""
+        """
+        Get stock alerts combining volume and sentiment. Never computes on the calling thread:
+        returns database alerts (cached) or the latest published snapshot. force_refresh only
+        queues a recomputation in the background worker.
+        """
         
         # Try to get alerts from database first (if stock_analysis.py has run)
         if self.use_database and not force_refresh:
-            db_alerts = self.get_alerts_from_database()
+            db_alerts = self.cache.get_or_compute(
+                'db_alerts', self._load_database_alerts, ttl=DB_ALERTS_TTL, stale_ttl=DB_ALERTS_TTL
+            )
             if db_alerts:
                 logger.info(f"Returning {len(db_alerts)} alerts from database")
-                self.cache['alerts'] = db_alerts
-                self.last_update = datetime.now()
                 return db_alerts
         
-        # Use cache if recent
-        if not force_refresh and self.last_update:
-            elapsed = (datetime.now() - self.last_update).seconds
-            if elapsed < REFRESH_INTERVAL and self.cache:
-                logger.info("Returning cached alerts")
-                return self.cache.get('alerts', [])
-        
+        self.refresher.start()
+        if force_refresh:
+            self.refresher.request_refresh()
+        snapshot = self.refresher.snapshot
+        return list(snapshot.value) if snapshot else []
+    
+    def _load_database_alerts(self):
+        alerts = self.get_alerts_from_database()
+        if alerts:
+            self.last_update = datetime.now()
+        return alerts
+    
+    def get_sentiment(self) -> pd.DataFrame:
+        """Sentiment per ticker; only refreshed every SENTIMENT_TTL seconds to preserve API quota"""
+        return self.cache.get_or_compute(
+            'sentiment', lambda: self.sentiment_analyzer.analyze_sentiment(MOCK_POSTS), ttl=SENTIMENT_TTL, stale_ttl=0
+        )
+    
+    def generate_alerts(self) -> tuple:
+        """Generate fresh stock alerts combining volume and sentiment (published as an immutable tuple)"""
         logger.info("Generating fresh alerts...")
         alerts = []
         
         # Fetch sentiment data (with quota-aware caching)
-        # Only refresh sentiment every 5 minutes to preserve API quota
-        sentiment_cache_valid = (
-            hasattr(self, 'sentiment_cache_time') and 
-            self.sentiment_cache_time and
-            (datetime.now() - self.sentiment_cache_time).seconds < 300
-        )
+        sentiment_df = self.get_sentiment()
         
-        if sentiment_cache_valid and hasattr(self, 'cached_sentiment'):
-            logger.info("Using cached sentiment data")
-            sentiment_df = self.cached_sentiment
-        else:
-            sentiment_df = self.sentiment_analyzer.analyze_sentiment(MOCK_POSTS)
-            self.cached_sentiment = sentiment_df
-            self.sentiment_cache_time = datetime.now()
-            logger.info("Refreshed sentiment data")
+        # Fetch all tickers concurrently, then compute indicators for all of them in one batch
+        data = self.volume_analyzer.fetch_many(TARGET_TICKERS, LOOKBACK_DAYS)
+        metrics = self.volume_analyzer.analyze_many(data)
+        sentiment_by_ticker = (
+            sentiment_df.groupby('ticker')['sentiment_score'].mean().to_dict() if not sentiment_df.empty else {}
+        )
         
-        # Process each ticker
+        # Assemble alerts per ticker (cheap lookups from here on)
+        ai_items = []
         for ticker in TARGET_TICKERS:
             try:
-                # Fetch stock data
-                df = self.volume_analyzer.fetch_stock_data(ticker, LOOKBACK_DAYS)
-                if df.empty:
+                m = metrics.get(ticker)
+                if m is None:
                     continue
                 
-                # Calculate volume metrics and RSI
-                df = self.volume_analyzer.calculate_volume_zscore(df)
-                df = self.volume_analyzer.calculate_rsi(df)
-                latest = df.iloc[-1]
-                
-                volume_z = latest['volume_z'] if 'volume_z' in df.columns else 0
-                volume_ratio = self.volume_analyzer.get_volume_ratio(df)
-                rsi = float(latest['RSI']) if 'RSI' in df.columns else 50.0
+                volume_z = m['volume_z']
+                volume_ratio = m['volume_ratio']
+                rsi = m['rsi']
                 priority = self.volume_analyzer.classify_alert(volume_z)
                 
                 # Get sentiment
-                sentiment_data = sentiment_df[sentiment_df['ticker'] == ticker]
-                sentiment_score = sentiment_data['sentiment_score'].mean() if not sentiment_data.empty else 0.0
+                sentiment_score = sentiment_by_ticker.get(ticker, 0.0)
                 
                 # Calculate mention count (mock for now)
                 mention_count = int(abs(sentiment_score) * 100 + volume_ratio * 50)
                 
                 # Get price data
-                current_price = float(latest['Close'])
-                prev_close = float(df.iloc[-2]['Close']) if len(df) > 1 else current_price
+                current_price = m['current_price']
+                prev_close = m['prev_close']
                 price_change = ((current_price - prev_close) / prev_close) * 100 if prev_close != 0 else 0
                 
                 # Generate AI advice (optimized to preserve quota)
-                # Only use AI for high-priority or significant alerts
+                # Only use AI for high-priority or significant alerts; those are batched into
+                # one request below, everything else gets rule-based advice right away
                 use_ai = (
                     priority in ['high', 'medium'] and  # Only high/medium priority
                     (volume_ratio > 2.5 or abs(sentiment_score) > 0.5) and  # Significant activity
@@ -508,50 +637,13 @@ class StockAlertSystem:
                 )
                 
                 if use_ai:
-                    try:
-                        advice = self.sentiment_analyzer.generate_stock_advice(
-                            ticker, current_price, price_change, volume_ratio, sentiment_score
-                        )
-                        # Delay to respect API rate limits (10 requests/minute)
-                        time.sleep(6)  # 10 requests/min = 6 sec between requests
-                    except Exception as e:
-                        logger.debug(f"AI advice unavailable for {ticker}, using rule-based: {e}")
-                        # Falls through to rule-based advice below
-                        use_ai = False
-                
-                if not use_ai:
-                    # Use enhanced rule-based advice
-                    sentiment_desc = "bullish" if sentiment_score > 0.3 else "bearish" if sentiment_score < -0.3 else "neutral"
-                    volume_desc = "extremely high" if volume_ratio > 3 else "elevated" if volume_ratio > 2 else "moderate"
-                    
-                    advice_parts = []
-                    advice_parts.append(f"{ticker} is experiencing {volume_desc} trading volume at {volume_ratio:.1f}x the average")
-                    
-                    if abs(price_change) > 5:
-                        direction = "surging" if price_change > 0 else "declining sharply"
-                        advice_parts.append(f"with the price {direction} by {abs(price_change):.1f}%")
-                    elif abs(price_change) > 2:
-                        direction = "rising" if price_change > 0 else "falling"
-                        advice_parts.append(f"while {direction} by {abs(price_change):.1f}%")
-                    else:
-                        advice_parts.append(f"with relatively stable pricing ({price_change:+.1f}%)")
-                    
-                    if abs(sentiment_score) > 0.5:
-                        advice_parts.append(f"Social sentiment is strongly {sentiment_desc} ({sentiment_score:+.1f})")
-                    elif abs(sentiment_score) > 0.3:
-                        advice_parts.append(f"showing {sentiment_desc} sentiment ({sentiment_score:+.1f})")
-                    
-                    if volume_ratio > 3 and abs(price_change) > 3:
-                        recommendation = "This combination of high volume and significant price movement suggests heightened volatility. Consider waiting for stabilization before entering positions"
-                    elif volume_ratio > 3:
-                        recommendation = "The unusual volume spike warrants close monitoring for potential breakout or breakdown patterns"
-                    elif volume_ratio > 2:
-                        recommendation = "Watch for confirmation of trend direction before taking positions"
-                    else:
-                        recommendation = "Monitor for volume confirmation before acting"
-                    
-                    advice_parts.append(recommendation + ".")
-                    advice = ". ".join(advice_parts)
+                    advice = None
+                    ai_items.append({
+                        'ticker': ticker, 'price': current_price, 'price_change': price_change,
+                        'volume_ratio': volume_ratio, 'sentiment_score': sentiment_score,
+                    })
+                else:
+                    advice = self.sentiment_analyzer.rule_based_advice(ticker, price_change, volume_ratio, sentiment_score)
                 
                 # Only include alerts with some activity
                 if priority != 'normal' or abs(sentiment_score) > 0.3:
@@ -575,16 +667,21 @@ class StockAlertSystem:
                 logger.error(f"Error processing {ticker}: {e}")
                 continue
         
+        # AI advice for all significant alerts in one batched (and cached) Gemini request
+        if ai_items:
+            ai_advice = self.sentiment_analyzer.generate_advice_batch(ai_items)
+            for alert in alerts:
+                if alert['advice'] is None:
+                    alert['advice'] = ai_advice[alert['ticker']]
+        
         # Sort by priority and volume ratio
         priority_order = {'high': 0, 'medium': 1, 'low': 2, 'normal': 3}
         alerts.sort(key=lambda x: (priority_order.get(x['priority'], 3), -x['volumeRatio']))
         
-        # Update cache
-        self.cache['alerts'] = alerts
         self.last_update = datetime.now()
         
         logger.info(f"Generated {len(alerts)} alerts")
-        return alerts
+        return tuple(alerts)
 
 
 # Initialize the alert system
@@ -603,7 +700,8 @@ def get_alerts():
             'success': True,
             'alerts': alerts,
             'timestamp': datetime.now().isoformat(),
-            'count': len(alerts)
+            'count': len(alerts),
+            'refresh': alert_system.refresher.status()
         })
     except Exception as e:
         logger.error(f"Error in /api/alerts: {e}")
@@ -661,7 +759,10 @@ def get_stats():
             'mediumPriority': len([a for a in alerts if a['priority'] == 'medium']),
             'lowPriority': len([a for a in alerts if a['priority'] == 'low']),
             'totalMentions': sum(a['mentionCount'] for a in alerts),
-            'lastUpdate': alert_system.last_update.isoformat() if alert_system.last_update else None
+            'lastUpdate': alert_system.last_update.isoformat() if alert_system.last_update else None,
+            'cache': alert_system.cache.stats(),
+            'sentimentCache': alert_system.sentiment_analyzer.sentiment_cache.stats(),
+            'refresh': alert_system.refresher.status()
         }
         
         return jsonify({
@@ -0,0 +1,173 @@
+"""
+Local OHLCV bar store on the stock_data table in alerts.db.
+Keyed by (ticker, date) so fetches only need to ask the provider
+for bars after the last stored date. stock_coverage records how far
+back each ticker has been fetched, so a request for a longer window
+than what is stored is refetched instead of served short (the gap before
+the first stored bar may just be non-trading days). Per-ticker streaming indicator
+state (indicators.IndicatorState) is kept alongside in indicator_state.
+"""
+
+# backend/ohlcv_store.py
+import json
+import pandas as pd
+
+try:
+    from backend.alerts_store import DB_PATH, get_connection
+except ImportError:  # imported from inside backend/
+    from alerts_store import DB_PATH, get_connection
+
+DATE_FMT = "%Y-%m-%d %H:%M:%S"
+COLUMNS = ["Date", "Open", "High", "Low", "Close", "Volume", "Ticker"]
+
+
+class OHLCVStore:
+    """Persistent per-ticker OHLCV bars with upsert and last-date lookups."""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.setup()
+
+    def _connect(self):
+        return get_connection(self.db_path)
+
+    def setup(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stock_data (
+                    ticker TEXT,
+                    date TEXT,
+                    close REAL,
+                    volume INTEGER
+                )
+            """)
+            # The original table only had close/volume; add the rest of the bar
+            existing = {r[1] for r in conn.execute("PRAGMA table_info(stock_data)")}
+            for col in ("open", "high", "low"):
+                if col not in existing:
+                    conn.execute(f"ALTER TABLE stock_data ADD COLUMN {col} REAL")
+            conn.execute("""
+                DELETE FROM stock_data WHERE rowid NOT IN (
+                    SELECT MAX(rowid) FROM stock_data GROUP BY ticker, date
+                )
+            """)
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_stock_data_ticker_date ON stock_data (ticker, date)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stock_coverage (
+                    ticker TEXT PRIMARY KEY,
+                    covered_from TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS indicator_state (
+                    ticker TEXT PRIMARY KEY,
+                    last_date TEXT,
+                    state TEXT
+                )
+            """)
+
+    def date_ranges(self, tickers) -> dict:
+        """
+        Return ticker -> (covered_from, last bar time) as Timestamps for tickers that have any bars.
+        covered_from is the earliest start fetched for the ticker, or its first bar if that is earlier
+        (or nothing was recorded).
+        """
+        tickers = list(tickers)
+        if not tickers:
+            return {}
+        marks = ",".join("?" * len(tickers))
+        with self._connect() as conn:
+            rows = conn.execute(f"""
+                SELECT s.ticker, MIN(s.date), MAX(s.date), c.covered_from
+                FROM stock_data s LEFT JOIN stock_coverage c ON c.ticker = s.ticker
+                WHERE s.ticker IN ({marks}) GROUP BY s.ticker
+            """, tickers).fetchall()
+        return {
+            t: (pd.Timestamp(min(first, cov) if cov else first), pd.Timestamp(last))
+            for t, first, last, cov in rows if first
+        }
+
+    def mark_covered(self, tickers, start) -> None:
+        """Record that tickers have been fetched from start onwards (keeps the earliest start)."""
+        start = pd.Timestamp(start).strftime(DATE_FMT)
+        with self._connect() as conn:
+            conn.executemany("""
+                INSERT INTO stock_coverage (ticker, covered_from) VALUES (?, ?)
+                ON CONFLICT(ticker) DO UPDATE SET covered_from = MIN(covered_from, excluded.covered_from)
+            """, [(t, start) for t in tickers])
+
+    def upsert(self, df: pd.DataFrame) -> int:
+        """Insert or replace bars from a long-format frame (Date/Datetime, Open..Volume, Ticker)."""
+        if df is None or df.empty:
+            return 0
+        date_col = "Date" if "Date" in df.columns else "Datetime"
+        dates = pd.to_datetime(df[date_col])
+        if getattr(dates.dt, "tz", None) is not None:
+            dates = dates.dt.tz_localize(None)
+        rows = list(zip(
+            df["Ticker"].astype(str),
+            dates.dt.strftime(DATE_FMT),
+            df["Open"].astype(float) if "Open" in df.columns else [None] * len(df),
+            df["High"].astype(float) if "High" in df.columns else [None] * len(df),
+            df["Low"].astype(float) if "Low" in df.columns else [None] * len(df),
+            df["Close"].astype(float),
+            df["Volume"].fillna(0).astype("int64"),
+        ))
+        rows = [(t, d, o, h, l, c, int(v)) for t, d, o, h, l, c, v in rows]
+        with self._connect() as conn:
+            conn.executemany("""
+                INSERT INTO stock_data (ticker, date, open, high, low, close, volume)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(ticker, date) DO UPDATE SET
+                    open=excluded.open, high=excluded.high, low=excluded.low,
+                    close=excluded.close, volume=excluded.volume
+            """, rows)
+        return len(rows)
+
+    def load(self, tickers, start=None) -> pd.DataFrame:
+        """Return stored bars for tickers (from start, if given) as a long frame ordered by ticker, date."""
+        tickers = list(tickers)
+        if not tickers:
+            return pd.DataFrame(columns=COLUMNS)
+        marks = ",".join("?" * len(tickers))
+        sql = f"""
+            SELECT date AS Date, open AS Open, high AS High, low AS Low,
+                   close AS Close, volume AS Volume, ticker AS Ticker
+            FROM stock_data WHERE ticker IN ({marks})
+        """
+        params = list(tickers)
+        if start is not None:
+            sql += " AND date >= ?"
+            params.append(pd.Timestamp(start).strftime(DATE_FMT))
+        with self._connect() as conn:
+            df = pd.read_sql_query(sql, conn, params=params)
+        if df.empty:
+            return pd.DataFrame(columns=COLUMNS)
+        df["Date"] = pd.to_datetime(df["Date"])
+        # Keep the caller's ticker order, bars oldest first
+        order = {t: i for i, t in enumerate(tickers)}
+        df["_order"] = df["Ticker"].map(order)
+        df = df.sort_values(["_order", "Date"]).drop(columns="_order").reset_index(drop=True)
+        return df
+
+    def load_indicator_states(self, tickers) -> dict:
+        """Return ticker -> IndicatorState.to_dict() payload for tickers that have saved state."""
+        tickers = list(tickers)
+        if not tickers:
+            return {}
+        marks = ",".join("?" * len(tickers))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT ticker, state FROM indicator_state WHERE ticker IN ({marks})", tickers
+            ).fetchall()
+        return {t: json.loads(s) for t, s in rows}
+
+    def save_indicator_states(self, states: dict) -> int:
+        """Upsert ticker -> IndicatorState.to_dict() payloads in one transaction."""
+        rows = [(t, d.get("last_date"), json.dumps(d)) for t, d in states.items()]
+        with self._connect() as conn:
+            conn.executemany("""
+                INSERT INTO indicator_state (ticker, last_date, state) VALUES (?, ?, ?)
+                ON CONFLICT(ticker) DO UPDATE SET last_date=excluded.last_date, state=excluded.state
+            """, rows)
+        return len(rows)
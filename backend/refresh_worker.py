@@ -0,0 +1,116 @@
+"""
+Background refresh worker for integrated_backend.py.
+
+A single daemon thread recomputes a value on a fixed interval, or sooner
+when a refresh is requested. Each result is published as a new immutable
+Snapshot with one reference assignment, so request handlers only ever read
+the latest complete snapshot and never wait on the computation.
+"""
+
+# backend/refresh_worker.py
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    value: Any  # treated as read-only once published
+    version: int
+    created_at: datetime
+    duration_s: float
+
+
+class RefreshWorker:
+    def __init__(self, compute: Callable[[], Any], interval: float, name: str = "refresh-worker"):
+        self.compute = compute
+        self.interval = interval
+        self.name = name
+        self._snapshot: Optional[Snapshot] = None
+        self._wake = threading.Event()
+        self._published = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._running = False
+        self.last_error: Optional[str] = None
+
+    @property
+    def snapshot(self) -> Optional[Snapshot]:
+        """Latest published snapshot (None until the first computation finishes)."""
+        return self._snapshot
+
+    def start(self) -> "RefreshWorker":
+        """Start the worker thread if it isn't running; the first computation starts right away."""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._wake.set()
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def request_refresh(self) -> bool:
+        """Queue a recomputation and return immediately. False if one was already queued."""
+        already = self._wake.is_set()
+        self._wake.set()
+        return not already
+
+    def wait_for_snapshot(self, min_version: int = 1, timeout: Optional[float] = None) -> Optional[Snapshot]:
+        """Block until a snapshot with version >= min_version is published (or timeout)."""
+        with self._published:
+            self._published.wait_for(
+                lambda: self._snapshot is not None and self._snapshot.version >= min_version, timeout
+            )
+            return self._snapshot
+
+    def status(self) -> Dict[str, Any]:
+        snap = self._snapshot
+        return {
+            "running": self._running,
+            "refreshQueued": self._wake.is_set(),
+            "version": snap.version if snap else 0,
+            "lastUpdate": snap.created_at.isoformat() if snap else None,
+            "lastDurationS": round(snap.duration_s, 3) if snap else None,
+            "lastError": self.last_error,
+        }
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            if self._stop.is_set():
+                break
+            # Requests that arrive while computing queue the next run instead of being lost
+            self._wake.clear()
+            self._running = True
+            t0 = time.perf_counter()
+            try:
+                value = self.compute()
+            except Exception as e:
+                logger.error(f"{self.name}: refresh failed: {e}")
+                self.last_error = str(e)
+                continue
+            finally:
+                self._running = False
+            self.last_error = None
+            prev = self._snapshot
+            snap = Snapshot(
+                value=value,
+                version=(prev.version if prev else 0) + 1,
+                created_at=datetime.now(),
+                duration_s=time.perf_counter() - t0,
+            )
+            with self._published:
+                self._snapshot = snap
+                self._published.notify_all()
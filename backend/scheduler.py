@@ -12,21 +12,49 @@ The integrated_backend.py API will automatically read from this database.
 Usage:
     python backend/scheduler.py
 
+Environment:
+    ALERT_INTERVAL_MINUTES  minutes between runs (default 10; e.g. 1 for intraday)
+    ALERT_STREAMING         1 to update indicators from persisted per-ticker state
+                            instead of recomputing over the fetched history
+    MODEL_TRAIN_HOURS       hours between confidence model retrains (default 24);
+                            the API hot-reloads the saved model file
+
 Note: Run this in the background or as a separate service.
 """
 
 # scheduler.py
 from apscheduler.schedulers.background import BackgroundScheduler
 from backend.update_alerts import main as update_alerts_main
+from backend.alert_history import compact_alert_history
+from backend.active_model import train_and_save
+from datetime import datetime
+import os
 import time
 
+INTERVAL_MINUTES = float(os.getenv("ALERT_INTERVAL_MINUTES", "10"))
+STREAMING = os.getenv("ALERT_STREAMING", "0") == "1"
+MODEL_TRAIN_HOURS = float(os.getenv("MODEL_TRAIN_HOURS", "24"))
+
 def scheduled_job():
     print("Running scheduled alert pipeline...")
-    update_alerts_main()
+    update_alerts_main(streaming=STREAMING)
+
+def compaction_job():
+    removed = compact_alert_history()
+    print(f"Compacted alert history ({removed} rows removed).")
+
+def training_job():
+    try:
+        bundle = train_and_save()
+        print(f"Trained confidence model {bundle['version']} on {bundle['n_rows']} rows.")
+    except ValueError as e:
+        print(f"Skipped confidence model training: {e}")
 
 if __name__ == "__main__":
     scheduler = BackgroundScheduler()
-    scheduler.add_job(scheduled_job, 'interval', minutes=10)
+    scheduler.add_job(scheduled_job, 'interval', minutes=INTERVAL_MINUTES, max_instances=1, coalesce=True)
+    scheduler.add_job(compaction_job, 'interval', hours=24)
+    scheduler.add_job(training_job, 'interval', hours=MODEL_TRAIN_HOURS, next_run_time=datetime.now())
     scheduler.start()
     print("Scheduler started. Press Ctrl+C to exit.")
     try:
@@ -0,0 +1,268 @@
+"""
+Per-post sentiment cache shared by integrated_backend.py and gemini.py.
+
+Each post is addressed by a hash of its (whitespace-normalized) text and
+maps to the per-ticker scores the model gave it. Entries live in an
+in-memory LRU backed by the post_sentiment table in alerts.db, so a
+restart doesn't resend posts either. analyze() only sends posts it has
+never seen to the model, in one numbered prompt, and keeps the
+per-ticker aggregate up to date by adding the posts that entered the
+window and subtracting the ones that left it.
+"""
+
+# backend/sentiment_cache.py
+import hashlib
+import json
+import logging
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+try:
+    from backend.alerts_store import get_connection, transaction
+except ImportError:  # imported from inside backend/
+    from alerts_store import get_connection, transaction
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_COLUMNS = ["ticker", "sentiment", "sentiment_score"]
+BULLISH_THRESHOLD = 0.3  # mean score above this is bullish, below -this bearish
+POSTS_PER_PROMPT = 50
+NO_TICKER = "NONE"  # ticker placeholder for a post that mentions no ticker
+
+# post hash -> {ticker: score}
+PostScores = Dict[str, float]
+
+
+def post_key(post: str) -> str:
+    """Content address of a post: sha256 of its text with whitespace collapsed."""
+    return hashlib.sha256(" ".join(post.split()).encode("utf-8")).hexdigest()
+
+
+def sentiment_label(score: float) -> str:
+    if score > BULLISH_THRESHOLD:
+        return "bullish"
+    if score < -BULLISH_THRESHOLD:
+        return "bearish"
+    return "neutral"
+
+
+def post_sentiment_prompt(posts: List[str]) -> str:
+    numbered = "\n".join(f"{i}. {' '.join(p.split())}" for i, p in enumerate(posts, 1))
+    return f"""
+    Analyze the sentiment for each stock ticker mentioned in each of these numbered social media posts.
+    Return ONLY a CSV format with headers: post,ticker,sentiment,sentiment_score
+
+    Rules:
+    - post is the number of the post the line is about
+    - sentiment should be: bullish, bearish, or neutral
+    - sentiment_score should be a number from -1 (very bearish) to +1 (very bullish)
+    - Only include tickers that are explicitly mentioned in that post
+    - One line per post and ticker; for a post that mentions no ticker write one line with ticker {NO_TICKER}
+
+    Posts:
+    {numbered}
+
+    Example output format:
+    post,ticker,sentiment,sentiment_score
+    1,GME,bullish,0.8
+    2,AMC,neutral,0.1
+    3,{NO_TICKER},neutral,0
+    """
+
+
+def parse_post_sentiment(raw_text: str, n_posts: int) -> Optional[Dict[int, PostScores]]:
+    """
+    Parse a per-post CSV response into post index -> {ticker: score} for the posts it covers
+    (a NO_TICKER line covers a post with no tickers). Posts missing from a truncated or partial
+    response are left out so they get asked about again. None if there is no recognisable header.
+    """
+    lines = raw_text.strip().splitlines()
+    start = next((i for i, line in enumerate(lines)
+                  if "post" in line.lower() and "ticker" in line.lower()), None)
+    if start is None:
+        return None
+    scores: Dict[int, PostScores] = {}
+    for line in lines[start + 1:]:
+        parts = [p.strip() for p in line.split(",")]
+        if len(parts) < 4 or line.startswith("#"):
+            continue
+        try:
+            idx = int(parts[0].rstrip(".")) - 1
+            score = max(-1.0, min(1.0, float(parts[3])))
+        except ValueError:
+            continue
+        if 0 <= idx < n_posts and parts[1]:
+            post = scores.setdefault(idx, {})
+            if parts[1].upper() != NO_TICKER:
+                post[parts[1].upper()] = score
+    return scores
+
+
+class PostSentimentCache:
+    def __init__(self, db_path: str = None, max_entries: int = 4096, max_disk_entries: int = 100_000,
+                 posts_per_prompt: int = POSTS_PER_PROMPT):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.posts_per_prompt = posts_per_prompt
+        self._entries: "OrderedDict[str, PostScores]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._setup_done = False
+        # Current window: post hash -> multiplicity (and its scores, independent of LRU eviction),
+        # and per-ticker [score sum, mention count] over it
+        self._window: Counter = Counter()
+        self._window_scores: Dict[str, PostScores] = {}
+        self._totals: Dict[str, List[float]] = {}
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "model_calls": 0, "errors": 0}
+
+    def _setup(self) -> None:
+        if self._setup_done:
+            return
+        with transaction(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS post_sentiment (
+                    post_hash TEXT PRIMARY KEY,
+                    scores TEXT NOT NULL,
+                    last_used TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_post_sentiment_last_used ON post_sentiment (last_used)")
+        self._setup_done = True
+
+    def _remember(self, key: str, scores: PostScores) -> None:
+        self._entries[key] = scores
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_many(self, keys) -> Dict[str, PostScores]:
+        """Cached scores for the given post hashes (memory first, then disk); unknown keys are left out."""
+        found, missing = {}, []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+                    self._stats["hits"] += 1
+                else:
+                    missing.append(key)
+            if missing:
+                self._setup()
+                conn = get_connection(self.db_path)
+                for i in range(0, len(missing), 500):
+                    chunk = missing[i:i + 500]
+                    rows = conn.execute(
+                        f"SELECT post_hash, scores FROM post_sentiment WHERE post_hash IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                    for key, scores in rows:
+                        found[key] = json.loads(scores)
+                        self._remember(key, found[key])
+                        self._stats["disk_hits"] += 1
+                self._stats["misses"] += len(missing) - sum(k in found for k in missing)
+        return found
+
+    def put_many(self, entries: Dict[str, PostScores]) -> None:
+        """Store scores in memory and on disk, pruning the least recently used rows past max_disk_entries."""
+        if not entries:
+            return
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            self._setup()
+            for key, scores in entries.items():
+                self._remember(key, scores)
+            with transaction(self.db_path) as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO post_sentiment (post_hash, scores, last_used) VALUES (?, ?, ?)",
+                    [(key, json.dumps(scores), now) for key, scores in entries.items()],
+                )
+                conn.execute("""
+                    DELETE FROM post_sentiment WHERE post_hash IN (
+                        SELECT post_hash FROM post_sentiment ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_disk_entries,))
+
+    def _touch(self, keys) -> None:
+        """Mark posts as used on disk, so pruning keeps the ones still being analyzed."""
+        now = datetime.now().isoformat(timespec="seconds")
+        with transaction(self.db_path) as conn:
+            conn.executemany("UPDATE post_sentiment SET last_used = ? WHERE post_hash = ?", [(now, k) for k in keys])
+
+    def _score_new_posts(self, posts: Dict[str, str], generate: Callable[[str], str]) -> Dict[str, PostScores]:
+        """
+        Ask the model about uncached posts, posts_per_prompt at a time. Only posts the response
+        covers are cached; failed chunks and posts a partial response left out are retried next call.
+        Called without the lock held, so readers aren't blocked for the model round-trip.
+        """
+        scored = {}
+        items = list(posts.items())
+        for i in range(0, len(items), self.posts_per_prompt):
+            chunk = items[i:i + self.posts_per_prompt]
+            with self._lock:
+                self._stats["model_calls"] += 1
+            try:
+                parsed = parse_post_sentiment(generate(post_sentiment_prompt([p for _, p in chunk])), len(chunk))
+            except Exception as e:
+                logger.error(f"Error in sentiment analysis for {len(chunk)} posts: {e}")
+                parsed = None
+            if parsed is None:
+                with self._lock:
+                    self._stats["errors"] += 1
+                continue
+            if len(parsed) < len(chunk):
+                logger.warning(f"Sentiment response covered {len(parsed)} of {len(chunk)} posts")
+            scored.update((chunk[idx][0], scores) for idx, scores in parsed.items())
+        self.put_many(scored)
+        return scored
+
+    def _apply(self, key: str, scores: PostScores, sign: int) -> None:
+        for ticker, score in scores.items():
+            total = self._totals.setdefault(ticker, [0.0, 0])
+            total[0] += sign * score
+            total[1] += sign
+            if total[1] <= 0:
+                del self._totals[ticker]
+
+    def analyze(self, posts: List[str], generate: Optional[Callable[[str], str]] = None) -> pd.DataFrame:
+        """
+        Per-ticker sentiment (mean score over the posts mentioning it) for the current post list.
+        Only posts not already cached are sent to generate(prompt) -> text; without generate they
+        are skipped and retried on the next call. The aggregate is updated by the change in posts.
+        """
+        keys = [post_key(p) for p in posts]
+        with self._lock:
+            known = self.get_many(keys)
+        new_posts = {k: p for k, p in zip(keys, posts) if k not in known}
+        if new_posts and generate is not None:
+            # The model call runs unlocked; put_many and the window update below take the lock again
+            known.update(self._score_new_posts(new_posts, generate))
+        with self._lock:
+            window = Counter(k for k in keys if k in known)
+            for key, n in (self._window - window).items():
+                for _ in range(n):
+                    self._apply(key, self._window_scores[key], -1)
+            entering = window - self._window
+            for key, n in entering.items():
+                for _ in range(n):
+                    self._apply(key, known[key], +1)
+            if entering:
+                self._touch(entering)
+            self._window = window
+            self._window_scores = {k: known[k] for k in window}
+            return self.aggregate()
+
+    def aggregate(self) -> pd.DataFrame:
+        with self._lock:
+            rows = [
+                {"ticker": t, "sentiment": sentiment_label(s / n), "sentiment_score": s / n}
+                for t, (s, n) in sorted(self._totals.items())
+            ]
+        return pd.DataFrame(rows, columns=SENTIMENT_COLUMNS)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "window_posts": sum(self._window.values())}
@@ -8,16 +8,12 @@ in alerts.db, sends email alerts for new triggers, and updates dashboard data.
 
 # backend/stock_analysis.py
 import pandas as pd
-import sqlite3
-import ta
 from datetime import datetime
 from notifier import send_alert_email
-from backend.stock_data_scraping import fetch_stock_data
-import os
-
-# Compute absolute path to alerts.db relative to this file
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "alerts.db")
+from backend.stock_data_scraping import fetch_stock_data, get_store
+from backend.indicators import IndicatorState, compute_indicators
+from backend.alerts_store import DB_PATH, transaction
+from backend.alert_history import ALERT_COLUMNS, record_alerts, setup_active_alerts, setup_alert_history
 
 def classify_alert(z: float) -> str:
     if pd.isna(z): return 'No data'
@@ -26,50 +22,65 @@ def classify_alert(z: float) -> str:
     elif z >= 1.5: return 'Low Alert'
     else: return 'Normal'
 
-def compute_rsi(series: pd.Series, window: int = 14) -> pd.Series:
-    rsi = ta.momentum.RSIIndicator(close=series, window=window).rsi()
-    return rsi.reindex(series.index, fill_value=None)
-
 def prepare_stock_data(tickers_list, days=1) -> pd.DataFrame:
-    data_frames = []
-    for t in tickers_list:
-        df = fetch_stock_data([t], days)
-        if df.empty: continue
-        df['Ticker'] = t
-        data_frames.append(df)
-    if not data_frames: return pd.DataFrame()
-    data = pd.concat(data_frames, ignore_index=True)
-    data['volume_z'] = data.groupby('Ticker')['Volume'].transform(
-        lambda x: (x - x.rolling(50).mean()) / x.rolling(50).std()
-    )
-    data['Volume_Ratio'] = data['Volume'] / data.groupby('Ticker')['Volume'].transform('mean')
+    # One batched download for all tickers, already in long format with a Ticker column
+    data = fetch_stock_data(tickers_list, days)
+    if data.empty: return pd.DataFrame()
+    # Rolling volume z-score, volume ratio and Wilder RSI for all tickers at once
+    data = compute_indicators(data, z_window=50, rsi_window=14)
     data['Volume_Alert'] = data['volume_z'].apply(classify_alert)
-    data['RSI'] = data.groupby('Ticker')['Close'].transform(lambda x: compute_rsi(x))
     data['Timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     return data
 
+def prepare_stock_data_streaming(tickers_list, days=1, z_window=50, rsi_window=14) -> pd.DataFrame:
+    """
+    Latest-bar indicators per ticker from persisted streaming state, for intraday runs.
+    Each ticker's IndicatorState is advanced only over closed bars newer than its last_date;
+    the newest bar may still be forming (it is re-fetched next run), so it is only peeked.
+    Tickers without saved state (or saved with other windows) are warmed from the local bar store once.
+    Returns one row per ticker with the same indicator columns as prepare_stock_data.
+    """
+    data = fetch_stock_data(tickers_list, days)
+    if data.empty: return pd.DataFrame()
+    store = get_store()
+    saved = store.load_indicator_states(data['Ticker'].unique())
+    saved = {t: d for t, d in saved.items() if (d['window'], d['rsi_window']) == (z_window, rsi_window)}
+    cold = [t for t in data['Ticker'].unique() if t not in saved]
+    if cold:
+        data = pd.concat([data[~data['Ticker'].isin(cold)], store.load(cold)], ignore_index=True)
+
+    rows, states = [], {}
+    for ticker, bars in data.groupby('Ticker', sort=False):
+        state = IndicatorState.from_dict(saved[ticker]) if ticker in saved else IndicatorState(z_window, rsi_window)
+        dates = pd.to_datetime(bars['Date']).dt.strftime("%Y-%m-%d %H:%M:%S").tolist()
+        closes, volumes = bars['Close'].tolist(), bars['Volume'].tolist()
+        for date, close, volume in zip(dates[:-1], closes[:-1], volumes[:-1]):
+            if state.last_date is None or date > state.last_date:
+                state.update(close, volume, date)
+        states[ticker] = state.to_dict()
+        if state.last_date is not None and dates[-1] <= state.last_date:
+            continue
+        row = bars.iloc[-1].to_dict()
+        row.update(state.peek(closes[-1], volumes[-1]))
+        rows.append(row)
+    store.save_indicator_states(states)
+
+    latest = pd.DataFrame(rows)
+    if latest.empty: return latest
+    latest['Volume_Alert'] = latest['volume_z'].apply(classify_alert)
+    latest['Timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return latest
+
+def _rows(df: pd.DataFrame, columns) -> list:
+    """Plain-Python parameter tuples for executemany (NaN binds as NULL)."""
+    if df.empty: return []
+    return list(zip(*(df[c].tolist() for c in columns)))
+
 def setup_database(db_path=DB_PATH):
-    with sqlite3.connect(db_path) as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS latest_alerts (
-                Ticker TEXT PRIMARY KEY,
-                Close REAL,
-                Volume INTEGER,
-                volume_z REAL,
-                Volume_Ratio REAL,
-                Volume_Alert TEXT,
-                RSI REAL,
-                Timestamp TEXT
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS active_alerts (
-                Ticker TEXT PRIMARY KEY,
-                Alert_Level TEXT,
-                Trigger_Volume REAL,
-                Timestamp TEXT
-            )
-        """)
+    with transaction(db_path) as conn:
+        # latest_alerts is a view over the append-only alert_history (see alert_history.py)
+        setup_alert_history(conn)
+        setup_active_alerts(conn)
 
 def get_latest_active_alerts(data: pd.DataFrame, threshold_z: float = 1.5):
     latest = data.groupby('Ticker').tail(1)[
@@ -81,28 +92,30 @@ def get_latest_active_alerts(data: pd.DataFrame, threshold_z: float = 1.5):
 
 def update_active_alerts(data: pd.DataFrame, active_alerts_new: pd.DataFrame,
                          db_path=DB_PATH, volume_tolerance=1.5):
-    newly_added = []
-    with sqlite3.connect(db_path) as conn:
-        existing_alerts = pd.read_sql_query("SELECT * FROM active_alerts", conn)
-        existing_tickers = set(existing_alerts['Ticker']) if not existing_alerts.empty else set()
-        for _, row in existing_alerts.iterrows():
-            ticker_data = active_alerts_new[active_alerts_new['Ticker'] == row['Ticker']]
-            if ticker_data.empty:
-                current_vol = data[data['Ticker'] == row['Ticker']].iloc[-1]['Volume']
-                if current_vol < row['Trigger_Volume'] * volume_tolerance:
-                    conn.execute("DELETE FROM active_alerts WHERE Ticker=?", (row['Ticker'],))
-        for _, row in active_alerts_new.iterrows():
-            if row['Ticker'] not in existing_tickers:
-                newly_added.append(row['Ticker'])
-            conn.execute("""
-                REPLACE INTO active_alerts (Ticker, Alert_Level, Trigger_Volume, Timestamp)
-                VALUES (?, ?, ?, ?)
-            """, (row['Ticker'], row['Volume_Alert'], row['Trigger_Volume'], row['Timestamp']))
+    # Latest volume per ticker, looked up instead of reslicing data for every existing alert
+    current_volume = data.groupby('Ticker', sort=False)['Volume'].last().to_dict()
+    new_rows = _rows(active_alerts_new, ['Ticker', 'Volume_Alert', 'Trigger_Volume', 'Timestamp'])
+    new_tickers = {r[0] for r in new_rows}
+    with transaction(db_path) as conn:
+        existing = conn.execute("SELECT Ticker, Trigger_Volume FROM active_alerts").fetchall()
+        existing_tickers = {t for t, _ in existing}
+        cleared = [
+            (t,) for t, trigger in existing
+            if t not in new_tickers and t in current_volume and current_volume[t] < trigger * volume_tolerance
+        ]
+        conn.executemany("DELETE FROM active_alerts WHERE Ticker=?", cleared)
+        conn.executemany("""
+            INSERT INTO active_alerts (Ticker, Alert_Level, Trigger_Volume, Timestamp)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(Ticker) DO UPDATE SET
+                Alert_Level=excluded.Alert_Level, Trigger_Volume=excluded.Trigger_Volume, Timestamp=excluded.Timestamp
+        """, new_rows)
+    newly_added = [r[0] for r in new_rows if r[0] not in existing_tickers]
     return newly_added
 
 def send_new_alert_emails(active_alerts_new: pd.DataFrame, newly_added: list, db_path=DB_PATH):
     if not newly_added: return
-    with sqlite3.connect(db_path) as conn:
+    with transaction(db_path) as conn:
         users = conn.execute("SELECT email, alerts FROM user_prefs").fetchall()
     for email, alerts_str in users:
         alert_list = alerts_str.split(",")
@@ -123,21 +136,17 @@ def send_new_alert_emails(active_alerts_new: pd.DataFrame, newly_added: list, db
             )
 
 def update_latest_alerts_table(active_alerts_new: pd.DataFrame, db_path=DB_PATH):
-    with sqlite3.connect(db_path) as conn:
-        conn.execute("DELETE FROM latest_alerts")
-        for _, row in active_alerts_new.iterrows():
-            conn.execute("""
-                INSERT INTO latest_alerts 
-                (Ticker, Close, Volume, volume_z, Volume_Ratio, Volume_Alert, RSI, Timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                row['Ticker'], row['Close'], row['Trigger_Volume'], row['volume_z'],
-                row['Volume_Ratio'], row['Volume_Alert'], row['RSI'], row['Timestamp']
-            ))
+    # Appended to alert_history as one run; latest_alerts (a view) then shows exactly these rows
+    columns = ['Trigger_Volume' if c == 'Volume' else c for c in ALERT_COLUMNS]
+    record_alerts(_rows(active_alerts_new, columns), db_path=db_path)
 
-def run_alert_pipeline(tickers, days: int = 1, alert_threshold_z: float = 1.5, volume_tolerance: float = 1.5):
+def run_alert_pipeline(tickers, days: int = 1, alert_threshold_z: float = 1.5, volume_tolerance: float = 1.5,
+                       streaming: bool = False):
     setup_database()
-    data = prepare_stock_data(tickers, days)
+    if streaming:
+        data = prepare_stock_data_streaming(tickers, days)
+    else:
+        data = prepare_stock_data(tickers, days)
     if data.empty:
         print("No stock data available. Exiting pipeline.")
         return pd.DataFrame()
@@ -4,36 +4,117 @@ Fetches tickers from Reddit hotstocks if not provided.
 """
 
 # backend/stock_data_scraping.py
+import threading
 import warnings
 import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 
-def fetch_stock_data(tickers, days=1):
-    """Fetch OHLCV data for given tickers and return a DataFrame."""
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    data_frames = []
+try:
+    from backend.ohlcv_store import OHLCVStore
+except ImportError:  # imported from inside backend/
+    from ohlcv_store import OHLCVStore
 
-    for t in tickers:
+_store = None
+# yf.download resets module-global result dicts on every call, so concurrent downloads
+# (e.g. the Flask refresh worker and a request handler) can drop or mix frames
+_download_lock = threading.Lock()
+
+
+def get_store():
+    """Shared OHLCV store on alerts.db (created on first use)."""
+    global _store
+    if _store is None:
+        _store = OHLCVStore()
+    return _store
+
+
+def _split_download(df: pd.DataFrame, chunk) -> list:
+    """Split a (possibly multi-ticker) yf.download frame into per-ticker frames with a Ticker column."""
+    if df is None or df.empty:
+        return []
+    if isinstance(df.columns, pd.MultiIndex):
+        level0 = df.columns.get_level_values(0)
+        parts = [(t, df[t]) for t in chunk if t in level0]
+    else:
+        parts = [(chunk[0], df)]
+    frames = []
+    for t, sub in parts:
+        sub = sub.dropna(how="all")
+        if sub.empty:
+            continue
+        sub = sub.reset_index()
+        sub.columns.name = None
+        sub["Ticker"] = t
+        frames.append(sub)
+    return frames
+
+
+def _download(tickers, start_date, end_date, chunk_size=100, quiet=()):
+    """
+    Download tickers in groups of chunk_size per yf.download call; returns per-ticker frames.
+    Tickers in quiet are not reported when they come back empty (e.g. no new bars yet).
+    """
+    data_frames = []
+    for i in range(0, len(tickers), chunk_size):
+        chunk = tickers[i:i + chunk_size]
         try:
-            with warnings.catch_warnings():
+            with _download_lock, warnings.catch_warnings():
                 warnings.simplefilter("ignore")
-                df = yf.download(t, start=start_date, end=end_date, progress=False)
-            if df.empty:
-                print(f"Skipping invalid or empty ticker: {t}")
-                continue
-            df.reset_index(inplace=True)
-            df = df.rename(columns={
-                "Date": "Date", "Open": "Open", "High": "High",
-                "Low": "Low", "Close": "Close", "Volume": "Volume"
-            })
-            df["Ticker"] = t
-            data_frames.append(df)
+                df = yf.download(
+                    chunk, start=start_date, end=end_date, progress=False,
+                    group_by="ticker", threads=True,
+                )
         except Exception as e:
-            print(f"❌ Error fetching {t}: {e}")
+            print(f"❌ Error fetching {', '.join(chunk)}: {e}")
             continue
+        frames = _split_download(df, chunk)
+        found = {f["Ticker"].iloc[0] for f in frames}
+        for t in chunk:
+            if t not in found and t not in quiet:
+                print(f"Skipping invalid or empty ticker: {t}")
+        data_frames.extend(frames)
+    return data_frames
+
+
+def fetch_stock_data(tickers, days=1, chunk_size=100, use_store=True):
+    """
+    Fetch OHLCV data for given tickers and return a single long-format DataFrame
+    (Date, Open, High, Low, Close, Volume, Ticker; one row per ticker per bar).
+    Tickers are requested in groups of chunk_size per yf.download call (threaded inside yfinance),
+    so fetch time stays roughly flat as the ticker list grows.
+    With use_store, bars are kept in the local OHLCV store and only bars from each ticker's
+    last stored date onwards are requested from the provider; the rest is served locally.
+    Tickers whose stored history doesn't reach back to the start of the window are refetched in full.
+    """
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+    tickers = list(dict.fromkeys(tickers))
+
+    if not use_store:
+        data_frames = _download(tickers, start_date, end_date, chunk_size)
+        if not data_frames:
+            return pd.DataFrame()
+        return pd.concat(data_frames, ignore_index=True)
+
+    store = get_store()
+    ranges = store.date_ranges(tickers)
+    # Group tickers by the date their delta starts at; the last stored bar is re-fetched
+    # because it may have been partial (e.g. stored mid-session). A ticker stored for a
+    # shorter window than this one starts from start_date so the window isn't served short.
+    by_start = {}
+    for t in tickers:
+        covered_from, last = ranges.get(t, (None, None))
+        t_start = max(start_date, last) if covered_from is not None and covered_from <= start_date else start_date
+        by_start.setdefault(t_start, []).append(t)
+    for t_start, group in by_start.items():
+        frames = _download(group, t_start, end_date, chunk_size, quiet=ranges)
+        if frames:
+            store.upsert(pd.concat(frames, ignore_index=True))
+            if t_start == start_date:
+                store.mark_covered([f["Ticker"].iloc[0] for f in frames], start_date)
 
-    if not data_frames:
+    data = store.load(tickers, start=start_date.date())
+    if data.empty:
         return pd.DataFrame()
-    return pd.concat(data_frames, ignore_index=True)
+    return data
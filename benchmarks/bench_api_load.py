@@ -0,0 +1,99 @@
+"""
+Load test for the FastAPI app (backend/apps.py) under concurrent clients.
+
+Each worker thread sends requests back to back for --duration seconds,
+round-robin over the selected endpoints, and per-endpoint p50/p99/max
+latency and throughput are reported. The mix is meant to show whether
+slow endpoints (e.g. /confidence) stall fast ones; run it against the
+server before and after a change and compare.
+
+Start the API first, e.g. from backend/:
+    uvicorn apps:app --port 8000
+
+Usage:
+    python benchmarks/bench_api_load.py [--url http://localhost:8000] [--concurrency 32] [--duration 10]
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ENDPOINTS = {
+    "latest-alerts": ("GET", "/latest-alerts", None),
+    "preferences-get": ("GET", "/preferences/loadtest@example.com", None),
+    "preferences-post": ("POST", "/preferences", {"email": "loadtest@example.com", "alerts": ["High Alert"]}),
+    "confidence": ("GET", "/confidence", None),
+    "confidence-batch": ("POST", "/confidence/batch", {"tickers": ["GME", "AMC", "TSLA", "NVDA"]}),
+}
+
+
+def request(base: str, method: str, path: str, body) -> int:
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base + path, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def percentile(values, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="FastAPI load test")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--endpoints", nargs="+", default=list(ENDPOINTS), choices=list(ENDPOINTS))
+    args = parser.parse_args(argv)
+
+    base = args.url.rstrip("/")
+    latencies = {name: [] for name in args.endpoints}
+    errors = {name: 0 for name in args.endpoints}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + args.duration
+
+    def worker(offset: int):
+        i = offset
+        while time.perf_counter() < stop_at:
+            name = args.endpoints[i % len(args.endpoints)]
+            i += 1
+            t0 = time.perf_counter()
+            try:
+                status = request(base, *ENDPOINTS[name])
+            except OSError:
+                status = 0
+            dt = time.perf_counter() - t0
+            with lock:
+                latencies[name].append(dt)
+                if status >= 400 or status == 0:
+                    errors[name] += 1
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(worker, range(args.concurrency)))
+
+    print(f"{args.concurrency} clients x {args.duration:.0f}s against {base}")
+    print(f"{'endpoint':<18} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name in args.endpoints:
+        lat = latencies[name]
+        if not lat:
+            print(f"{name:<18} {0:>8}")
+            continue
+        print(
+            f"{name:<18} {len(lat):>8} {errors[name]:>6} {len(lat) / args.duration:>8.1f} "
+            f"{statistics.median(lat) * 1e3:>8.1f} {percentile(lat, 0.99) * 1e3:>8.1f} {max(lat) * 1e3:>8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
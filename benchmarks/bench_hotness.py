@@ -0,0 +1,106 @@
+"""
+Benchmark time-decayed hotness: full recompute vs incremental HotnessWindow.
+
+Simulates a 240h window holding --posts posts and a rescoring tick every
+minute in which --new-per-tick posts arrive. The full recompute re-runs
+aggregate_and_score (decay mode) over every post in the window on each
+tick; the window only ingests new posts, expires old ones and reports
+changed tickers.
+
+Usage:
+    python benchmarks/bench_hotness.py [--posts 50000] [--ticks 60] [--new-per-tick 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signals.hotstocks.hotness import HotnessWindow, aggregate_and_score  # noqa: E402
+
+WINDOW_H = 240
+HALF_LIFE_H = 24.0
+WEIGHTS = {"mentions": 1.0, "upvotes": 0.1, "comments": 0.2}
+
+
+def make_post(rnd: random.Random, i: int, ts: float, symbols: list) -> dict:
+    tickers = set(rnd.sample(symbols, rnd.randint(1, 3)))
+    return {
+        "id": f"p{i}",
+        "created_utc": ts,
+        "score": rnd.randint(0, 5000),
+        "num_comments": rnd.randint(0, 500),
+        "permalink": f"/r/x/comments/p{i}/",
+        "tickers": tickers,
+        "mentions": {t: rnd.randint(1, 20) for t in tickers},
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Decayed hotness benchmark")
+    parser.add_argument("--posts", type=int, default=50_000, help="Posts in the window at start")
+    parser.add_argument("--ticks", type=int, default=60, help="Number of one-minute rescoring ticks")
+    parser.add_argument("--new-per-tick", type=int, default=20, help="New posts arriving per tick")
+    parser.add_argument("--symbols", type=int, default=2_000, help="Distinct tickers")
+    args = parser.parse_args(argv)
+
+    rnd = random.Random(11)
+    symbols = [f"T{i}" for i in range(args.symbols)]
+    now = 1_700_000_000.0
+    posts = [make_post(rnd, i, now - rnd.random() * WINDOW_H * 3600, symbols) for i in range(args.posts)]
+    arrivals = [
+        [make_post(rnd, args.posts + k * args.new_per_tick + j, now + 60 * (k + 1), symbols)
+         for j in range(args.new_per_tick)]
+        for k in range(args.ticks)
+    ]
+
+    # Full recompute each tick
+    live = list(posts)
+    t_full = 0.0
+    for k in range(args.ticks):
+        tick_now = now + 60 * (k + 1)
+        live.extend(arrivals[k])
+        live = [p for p in live if p["created_utc"] >= tick_now - WINDOW_H * 3600]
+        t0 = time.perf_counter()
+        aggregate_and_score(
+            all_posts=live,
+            post_level_tickers={p["id"]: p["tickers"] for p in live},
+            mention_counts={},
+            post_metrics={p["id"]: p for p in live},
+            weights=WEIGHTS,
+            half_life_hours=HALF_LIFE_H,
+            post_mentions={p["id"]: p["mentions"] for p in live},
+            now=tick_now,
+        )
+        t_full += time.perf_counter() - t0
+
+    # Incremental window
+    hw = HotnessWindow(WINDOW_H, WEIGHTS, half_life_hours=HALF_LIFE_H)
+    t0 = time.perf_counter()
+    for p in posts:
+        hw.add_post(p["id"], p["created_utc"], p["tickers"], p["score"], p["num_comments"], p["permalink"], p["mentions"])
+    hw.advance(now)
+    hw.scores()
+    t_load = time.perf_counter() - t0
+    t_inc = 0.0
+    for k in range(args.ticks):
+        t0 = time.perf_counter()
+        for p in arrivals[k]:
+            hw.add_post(p["id"], p["created_utc"], p["tickers"], p["score"], p["num_comments"], p["permalink"], p["mentions"])
+        hw.advance(now + 60 * (k + 1))
+        hw.scores()
+        t_inc += time.perf_counter() - t0
+
+    print(f"posts in window: {args.posts:,}  ticks: {args.ticks}  new/tick: {args.new_per_tick}")
+    print(f"full recompute:   {t_full / args.ticks * 1000:10.2f} ms/tick")
+    print(f"window (initial): {t_load * 1000:10.2f} ms one-off load")
+    print(f"window (update):  {t_inc / args.ticks * 1000:10.2f} ms/tick")
+    print(f"speedup per tick: {t_full / max(t_inc, 1e-9):10.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
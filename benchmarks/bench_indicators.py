@@ -0,0 +1,77 @@
+"""
+Benchmark the vectorized indicator engine against the per-ticker pandas path.
+
+The baseline is what prepare_stock_data used to do: groupby().transform()
+with a Python lambda per ticker for the rolling z-score and one
+ta.momentum.RSIIndicator per ticker. The engine is
+backend.indicators.compute_indicators over a ticker x time matrix.
+
+Usage:
+    python benchmarks/bench_indicators.py [--tickers 1000 10000] [--bars 250]
+
+The baseline needs the `ta` package (no longer a runtime dependency);
+pass --skip-baseline without it.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from indicators import compute_indicators  # noqa: E402
+
+
+def make_data(n_tickers: int, bars: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_tickers, bars)), axis=1))
+    volume = rng.lognormal(14, 0.5, (n_tickers, bars)).round()
+    return pd.DataFrame({
+        "Ticker": np.repeat([f"T{i}" for i in range(n_tickers)], bars),
+        "Close": close.ravel(),
+        "Volume": volume.ravel(),
+    })
+
+
+def baseline(data: pd.DataFrame) -> pd.DataFrame:
+    import ta
+
+    data['volume_z'] = data.groupby('Ticker')['Volume'].transform(
+        lambda x: (x - x.rolling(50).mean()) / x.rolling(50).std()
+    )
+    data['Volume_Ratio'] = data['Volume'] / data.groupby('Ticker')['Volume'].transform('mean')
+    data['RSI'] = data.groupby('Ticker')['Close'].transform(
+        lambda x: ta.momentum.RSIIndicator(close=x, window=14).rsi()
+    )
+    return data
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Indicator engine benchmark")
+    parser.add_argument("--tickers", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--bars", type=int, default=250, help="Bars per ticker")
+    parser.add_argument("--skip-baseline", action="store_true", help="Only time the engine")
+    args = parser.parse_args(argv)
+
+    for n in args.tickers:
+        data = make_data(n, args.bars)
+        t0 = time.perf_counter()
+        out = compute_indicators(data.copy())
+        t_engine = time.perf_counter() - t0
+        line = f"{n:>6,} tickers x {args.bars} bars  engine: {t_engine:7.3f}s"
+        if not args.skip_baseline:
+            t0 = time.perf_counter()
+            ref = baseline(data.copy())
+            t_base = time.perf_counter() - t0
+            err = np.nanmax(np.abs(ref['RSI'].to_numpy() - out['RSI'].to_numpy()))
+            line += f"  per-ticker pandas/ta: {t_base:7.3f}s  speedup: {t_base / t_engine:6.1f}x  max RSI diff: {err:.1e}"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+"""
+Benchmark ticker extraction throughput on a synthetic comment corpus.
+
+Compares the per-comment extract_tickers loop (as cli.py used to do) with
+extract_tickers_batch over the same texts, and reports texts/sec.
+
+Usage:
+    python benchmarks/bench_tickers.py [--n 1000000] [--whitelist]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signals.hotstocks.tickers import extract_tickers, extract_tickers_batch  # noqa: E402
+
+SYMBOLS = ["GME", "AMC", "TSLA", "NVDA", "PLTR", "BB", "NOK", "AAPL", "MSFT", "SPY"]
+WORDS = [
+    "the", "to", "moon", "buy", "calls", "puts", "holding", "diamond", "hands", "YOLO",
+    "DD", "is", "going", "up", "down", "I", "think", "earnings", "next", "week",
+]
+
+
+def make_corpus(n: int, seed: int = 7) -> list:
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        words = [rnd.choice(WORDS) for _ in range(rnd.randint(5, 25))]
+        for _ in range(rnd.randint(0, 3)):
+            sym = rnd.choice(SYMBOLS)
+            words.insert(rnd.randrange(len(words) + 1), f"${sym}" if rnd.random() < 0.3 else sym)
+        out.append(" ".join(words))
+    return out
+
+
+def _time(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Ticker extraction benchmark")
+    parser.add_argument("--n", type=int, default=1_000_000, help="Number of synthetic comments")
+    parser.add_argument("--whitelist", action="store_true", help="Use a whitelist (trie automaton path)")
+    args = parser.parse_args(argv)
+
+    whitelist = set(SYMBOLS) if args.whitelist else None
+    print(f"Building corpus of {args.n:,} comments...")
+    texts = make_corpus(args.n)
+
+    def per_call():
+        counts = {}
+        for c in texts:
+            for t, cnt in extract_tickers(c, whitelist=whitelist, count_occurrences=True).items():
+                counts[t] = counts.get(t, 0) + cnt
+        return counts
+
+    def batch():
+        return extract_tickers_batch(texts, whitelist=whitelist)
+
+    assert per_call() == batch()
+    t_loop = _time(per_call)
+    t_batch = _time(batch)
+    print(f"per-call loop: {t_loop:8.2f}s  {args.n / t_loop:12,.0f} texts/sec")
+    print(f"batch:         {t_batch:8.2f}s  {args.n / t_batch:12,.0f} texts/sec")
+    print(f"speedup:       {t_loop / t_batch:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,72 +1,124 @@
 import argparse
+import hashlib
+import json
+import threading
+import time
 import traceback
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 from .config import load_config
-from .reddit import fetch_recent_posts, fetch_comments_for_post
-from .tickers import extract_tickers
-from .hotness import aggregate_and_score
-from .io import write_output
+from .tickers import get_extractor
+from .hotness import HotnessWindow
+from .snapshot import CrawlSnapshot, get_snapshot
+from .io import append_snapshot, write_output
 
 
-def run_pipeline(cfg: dict) -> dict:
-    subs = cfg["subs"]
+class _PipelineWindow:
+    """
+    HotnessWindow kept across run_pipeline calls with the same settings, plus each post's
+    comment mention counts keyed by a fingerprint of its comment bodies, so a run only rescans
+    comments that changed and only re-adds posts whose metrics changed.
+    """
+
+    def __init__(self, window: HotnessWindow):
+        self.window = window
+        self.comment_counts: Dict[str, Tuple[str, Dict[str, int]]] = {}  # post_id -> (fingerprint, counts)
+        self.lock = threading.Lock()
+
+
+_MAX_WINDOWS = 8  # pipeline configs whose windows are kept; least recently used dropped first
+_WINDOWS: "OrderedDict[str, _PipelineWindow]" = OrderedDict()
+_WINDOWS_LOCK = threading.Lock()
+
+
+def _comments_fingerprint(bodies) -> str:
+    """Stable digest of a post's comment bodies (unlike hash(), not salted per process)."""
+    h = hashlib.sha1()
+    for body in bodies:
+        h.update(body.encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _get_window(cfg: dict, lookback_hours: int, weights: dict, permalinks_per_ticker: int,
+                half_life_hours: Optional[float]) -> _PipelineWindow:
+    key = json.dumps(
+        [cfg.get("subs"), cfg.get("base_url"), cfg.get("state_path"), lookback_hours, weights,
+         permalinks_per_ticker, half_life_hours, sorted(map(str.upper, cfg.get("ticker_whitelist", []))),
+         sorted(map(str.upper, cfg.get("ticker_blacklist", [])))],
+        sort_keys=True,
+    )
+    with _WINDOWS_LOCK:
+        pw = _WINDOWS.get(key)
+        if pw is None:
+            pw = _WINDOWS[key] = _PipelineWindow(
+                HotnessWindow(lookback_hours, weights, permalinks_per_ticker, half_life_hours=half_life_hours)
+            )
+            while len(_WINDOWS) > _MAX_WINDOWS:
+                _WINDOWS.popitem(last=False)
+        _WINDOWS.move_to_end(key)
+        return pw
+
+
+def _window_scores(pw: _PipelineWindow, snapshot: CrawlSnapshot, extractor, whitelist, now: float) -> Dict[str, dict]:
+    """Bring the pipeline window in line with the snapshot (only changed posts touch it) and score it."""
+    comments_by_link = snapshot.comments()
+    with pw.lock:
+        live = set()
+        for i, p in enumerate(snapshot.posts):
+            post_id = p.get("id")
+            live.add(post_id)
+            post_counts = snapshot.post_counts.get(post_id, {})
+            if whitelist is not None:
+                post_counts = {t: c for t, c in post_counts.items() if t in whitelist}
+            bodies = comments_by_link.get(p.get("permalink"), [])
+            fp = _comments_fingerprint(bodies)
+            cached = pw.comment_counts.get(post_id)
+            if cached is None or cached[0] != fp:
+                cached = pw.comment_counts[post_id] = (fp, extractor.batch_counts(bodies))
+            mentions = dict(post_counts)
+            for t, cnt in cached[1].items():
+                mentions[t] = mentions.get(t, 0) + cnt
+            pw.window.add_post(
+                post_id,
+                float(p.get("created_utc") or now),
+                post_counts,
+                p.get("score"),
+                p.get("num_comments"),
+                p.get("permalink"),
+                mentions,
+                order=i,
+            )
+        for post_id in pw.window.post_ids() - live:
+            pw.window.remove_post(post_id)
+        for post_id in set(pw.comment_counts) - live:
+            del pw.comment_counts[post_id]
+        pw.window.advance(now)
+        return pw.window.snapshot()
+
+
+def run_pipeline(cfg: dict, snapshot: Optional[CrawlSnapshot] = None) -> dict:
     lookback_hours = int(cfg.get("lookback_hours", 240))
-    limits = cfg.get("limits", {})
-    posts_per_sub = int(limits.get("posts_per_sub", 100))
-    comments_per_post = int(limits.get("comments_per_post", 200))
     weights = cfg.get("weights", {"mentions": 1.0, "upvotes": 0.1, "comments": 0.2})
     threshold = float(cfg.get("threshold", 750.0))
     permalinks_per_ticker = int(cfg.get("permalinks_per_ticker", 3))
     whitelist = set(map(str.upper, cfg.get("ticker_whitelist", []))) or None
     blacklist = set(map(str.upper, cfg.get("ticker_blacklist", [])))
+    extractor = get_extractor(whitelist, blacklist)
+    scoring = cfg.get("scoring", {})
+    half_life_hours = float(scoring.get("half_life_hours", 24.0)) if scoring.get("mode") == "decay" else None
 
-    all_posts = []
-    for sub in subs:
-        posts = fetch_recent_posts(sub, lookback_hours=lookback_hours, limit=posts_per_sub)
-        all_posts.extend(posts)
-
-    # Extract tickers from post title/selftext and comments
-    post_level_tickers = {}  # post_id -> set(tickers) found in post content
-    mention_counts = {}  # ticker -> total mentions across posts+comments
-    post_metrics = {}  # post_id -> dict of fields (score, num_comments, permalink)
-
-    for p in all_posts:
-        post_id = p.get("id")
-        title = p.get("title") or ""
-        body = p.get("selftext") or ""
-        merged = f"{title}\n{body}"
-        tickers_in_post = extract_tickers(merged, whitelist=whitelist, blacklist=blacklist)
-        if tickers_in_post:
-            post_level_tickers[post_id] = tickers_in_post
-        # Mentions in post content counted as occurrences
-        for t, cnt in extract_tickers(merged, whitelist=whitelist, blacklist=blacklist, count_occurrences=True).items():
-            mention_counts[t] = mention_counts.get(t, 0) + cnt
-        post_metrics[post_id] = {
-            "score": int(p.get("score") or 0),
-            "num_comments": int(p.get("num_comments") or 0),
-            "permalink": p.get("permalink"),
-        }
+    if snapshot is None:
+        snapshot = get_snapshot(cfg)
+
+    # The window kept from earlier runs only takes in posts that changed since; in decay mode it
+    # stores contributions against a fixed reference time, so aging is one factor applied on read
+    pw = _get_window(cfg, lookback_hours, weights, permalinks_per_ticker, half_life_hours)
+    scored = _window_scores(pw, snapshot, extractor, whitelist, time.time())
+    return _result(scored, lookback_hours, threshold, half_life_hours)
 
-    # Fetch and scan comments per post (limited)
-    for p in all_posts:
-        post_id = p.get("id")
-        permalink = p.get("permalink")
-        try:
-            comments = fetch_comments_for_post(permalink, limit=comments_per_post)
-        except Exception:
-            comments = []
-        for c in comments:
-            for t, cnt in extract_tickers(c, whitelist=whitelist, blacklist=blacklist, count_occurrences=True).items():
-                mention_counts[t] = mention_counts.get(t, 0) + cnt
-
-    scored = aggregate_and_score(
-        all_posts=all_posts,
-        post_level_tickers=post_level_tickers,
-        mention_counts=mention_counts,
-        post_metrics=post_metrics,
-        weights=weights,
-        permalinks_per_ticker=permalinks_per_ticker,
-    )
 
+def _result(scored: Dict[str, dict], lookback_hours: int, threshold: float, half_life_hours: Optional[float]) -> dict:
     # Apply threshold
     items = [
         {
@@ -85,52 +137,40 @@ def run_pipeline(cfg: dict) -> dict:
 
     return {
         "window_hours": lookback_hours,
+        "scoring": "decay" if half_life_hours is not None else "linear",
         "threshold": threshold,
         "items": items,
         "all_count": len(scored),
     }
 
 
-def get_hot_tickers(cfg: dict) -> list[str]:
-    return [it["ticker"] for it in run_pipeline(cfg)["items"]]
+def get_hot_tickers(cfg: dict, snapshot: Optional[CrawlSnapshot] = None) -> list[str]:
+    return [it["ticker"] for it in run_pipeline(cfg, snapshot=snapshot)["items"]]
 
 
-def find_posts_with_tickers(cfg: dict, tickers: list[str]) -> list[dict]:
+def find_posts_with_tickers(cfg: dict, tickers: list[str], snapshot: Optional[CrawlSnapshot] = None) -> list[dict]:
     """
     Return recent Reddit posts that mention any of the given tickers.
     Each item includes subreddit, title, tickers_found, score, num_comments, and permalink.
+    Uses the shared crawl snapshot's ticker index instead of re-fetching and re-scanning posts.
     """
-    subs = cfg["subs"]
-    lookback_hours = int(cfg.get("lookback_hours", 240))
-    limits = cfg.get("limits", {})
-    posts_per_sub = int(limits.get("posts_per_sub", 100))
+    if snapshot is None:
+        snapshot = get_snapshot(cfg)
 
     # Normalize tickers for matching
-    whitelist = set(t.upper() for t in tickers)
     blacklist = set(map(str.upper, cfg.get("ticker_blacklist", [])))
-
-    all_posts = []
-    for sub in subs:
-        posts = fetch_recent_posts(sub, lookback_hours=lookback_hours, limit=posts_per_sub)
-        all_posts.extend(posts)
+    wanted = {t.upper() for t in tickers} - blacklist
 
     results = []
-    for p in all_posts:
-        title = p.get("title") or ""
-        body = p.get("selftext") or ""
-        merged = f"{title}\n{body}"
-
-        # Only find tickers from your provided list
-        found = extract_tickers(merged, whitelist=whitelist, blacklist=blacklist)
-        if found:
-            results.append({
-                "subreddit": p.get("subreddit"),
-                "title": title.strip(),
-                "tickers_found": list(found),
-                "score": int(p.get("score") or 0),
-                "num_comments": int(p.get("num_comments") or 0),
-
-            })
+    for p, found in snapshot.posts_with_tickers(wanted):
+        results.append({
+            "subreddit": p.get("subreddit"),
+            "title": (p.get("title") or "").strip(),
+            "tickers_found": found,
+            "score": int(p.get("score") or 0),
+            "num_comments": int(p.get("num_comments") or 0),
+
+        })
     return results
 
 
@@ -149,6 +189,16 @@ def main(argv=None):
         output_path = cfg.get("output_path", "data/hotstocks.json")
         write_output(output_path, result)
         print(f"Wrote output: {output_path}")
+        stream = cfg.get("stream", {})
+        if stream.get("path"):
+            n = append_snapshot(
+                stream["path"],
+                result,
+                fmt=stream.get("format", "jsonl"),
+                max_bytes=int(stream.get("max_bytes", 64 * 1024 * 1024)),
+                backups=int(stream.get("backups", 3)),
+            )
+            print(f"Appended {n} records to stream: {stream['path']}")
         if not result["items"]:
             print("No tickers met the threshold. See message in JSON artifact.")
         return 0
@@ -8,8 +8,14 @@ DEFAULTS: Dict[str, Any] = {
     "lookback_hours": 240,
     "threshold": 750.0,
     "weights": {"mentions": 10.0, "upvotes": 0.5, "comments": 1.0},
-    "limits": {"posts_per_sub": 100, "comments_per_post": 200},
+    "scoring": {"mode": "linear", "half_life_hours": 24.0},
+    "limits": {"posts_per_sub": 100, "comments_per_post": 200, "max_concurrent_requests": 8},
+    "base_url": "https://www.reddit.com",
+    "rate_limit": {"requests_per_second": 2.0, "burst": 10, "max_requests_per_second": 10.0},
     "output_path": "data/hotstocks.json",
+    "state_path": "data/hotstocks_state.db",
+    "snapshot_ttl_seconds": 300,
+    "stream": {"path": "data/hotstocks.jsonl", "format": "jsonl", "max_bytes": 67108864, "backups": 3},
     "permalinks_per_ticker": 3,
     "ticker_whitelist": [],
     "ticker_blacklist": [],
@@ -1,4 +1,13 @@
-from typing import Dict, List, Set, Tuple
+import heapq
+import itertools
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def decay_factor(created_utc: float, now: float, half_life_hours: float) -> float:
+    """Weight of an event created at created_utc, seen at now: halves every half_life_hours."""
+    age_h = max(0.0, (now - float(created_utc)) / 3600.0)
+    return 0.5 ** (age_h / float(half_life_hours))
 
 
 def aggregate_and_score(
@@ -9,27 +18,49 @@ def aggregate_and_score(
     post_metrics: Dict[str, dict],
     weights: Dict[str, float],
     permalinks_per_ticker: int = 3,
+    half_life_hours: Optional[float] = None,
+    post_mentions: Optional[Dict[str, Dict[str, int]]] = None,
+    now: Optional[float] = None,
 ) -> Dict[str, dict]:
     """
     Aggregate per-ticker metrics and compute hotness.
     - mentions: total occurrences across posts + comments
     - upvotes/comments: sum per post that mentions the ticker (title/selftext)
     - permalinks: top post permalinks by score for that ticker
+    - half_life_hours: if set, each post's contribution is weighted by its age (exponential decay);
+      mentions are decayed too when post_mentions (post_id -> ticker counts) is given
     """
+    decay = half_life_hours is not None
+    now = time.time() if now is None else now
+    posts_by_id = {p.get("id"): p for p in all_posts}
+
+    def weight(pid: str) -> float:
+        if not decay:
+            return 1
+        created = (posts_by_id.get(pid) or {}).get("created_utc")
+        return decay_factor(created, now, half_life_hours) if created is not None else 1.0
+
+    if decay and post_mentions is not None:
+        mention_counts = {}
+        for pid, counts in post_mentions.items():
+            w = weight(pid)
+            for t, c in counts.items():
+                mention_counts[t] = mention_counts.get(t, 0) + c * w
+
     per_ticker = {t: {"mentions": c, "upvotes": 0, "comments": 0, "permalinks": []} for t, c in mention_counts.items()}
 
     # Gather per-ticker post-based metrics
-    posts_by_id = {p.get("id"): p for p in all_posts}
     for pid, tickers in post_level_tickers.items():
         met = post_metrics.get(pid, {})
         score = int(met.get("score") or 0)
         ncom = int(met.get("num_comments") or 0)
         link = met.get("permalink")
+        w = weight(pid)
         for t in tickers:
             if t not in per_ticker:
                 per_ticker[t] = {"mentions": 0, "upvotes": 0, "comments": 0, "permalinks": []}
-            per_ticker[t]["upvotes"] += score
-            per_ticker[t]["comments"] += ncom
+            per_ticker[t]["upvotes"] += score * w
+            per_ticker[t]["comments"] += ncom * w
             if link:
                 per_ticker[t]["permalinks"].append((score, link))
 
@@ -37,15 +68,15 @@ def aggregate_and_score(
     w_mentions = float(weights.get("mentions", 1.0))
     w_upvotes = float(weights.get("upvotes", 0.1))
     w_comments = float(weights.get("comments", 0.2))
+    num = float if decay else int
 
     result: Dict[str, dict] = {}
     for t, m in per_ticker.items():
         links: List[Tuple[int, str]] = m.get("permalinks", [])
-        links.sort(key=lambda x: x[0], reverse=True)
-        pl = [l for _, l in links[:permalinks_per_ticker]]
-        mentions = int(m.get("mentions", 0))
-        upvotes = int(m.get("upvotes", 0))
-        comments = int(m.get("comments", 0))
+        pl = [l for _, l in heapq.nlargest(permalinks_per_ticker, links, key=lambda x: x[0])]
+        mentions = num(m.get("mentions", 0))
+        upvotes = num(m.get("upvotes", 0))
+        comments = num(m.get("comments", 0))
         hotness = w_mentions * mentions + w_upvotes * upvotes + w_comments * comments
         result[t] = {
             "mentions": mentions,
@@ -56,3 +87,237 @@ def aggregate_and_score(
         }
     return result
 
+
+class HotnessWindow:
+    """
+    Stateful sliding-window version of aggregate_and_score.
+    - Posts and free-standing mention batches are ingested as timestamped events.
+    - advance(now) expires events older than the window and only touches the tickers they affect.
+    - Each ticker keeps a min-heap of (score, post_id) for its permalinks: the top k plus any posts tied
+      with the k-th score. Ties are ranked by post order (order= on add_post, else first-added first),
+      the same way aggregate_and_score ranks ties by position in all_posts.
+    - Re-adding a post with unchanged fields is a no-op, so callers can feed a whole crawl each run.
+    - scores() returns the tickers changed since the last call, so rescoring costs O(changed tickers).
+    - half_life_hours enables exponential decay. Contributions are stored scaled to a fixed reference time,
+      so nothing is rescanned as time passes: every ticker decays by the same factor, applied on read.
+    """
+
+    # Rebase stored values once the reference time is this many half-lives old (keeps floats in range)
+    _REBASE_HALF_LIVES = 64.0
+
+    def __init__(
+        self,
+        window_hours: float,
+        weights: Dict[str, float],
+        permalinks_per_ticker: int = 3,
+        half_life_hours: Optional[float] = None,
+    ):
+        self.window_s = float(window_hours) * 3600.0
+        self.w_mentions = float(weights.get("mentions", 1.0))
+        self.w_upvotes = float(weights.get("upvotes", 0.1))
+        self.w_comments = float(weights.get("comments", 0.2))
+        self.k = int(permalinks_per_ticker)
+        self.half_life_s = float(half_life_hours) * 3600.0 if half_life_hours else None
+        self._seq = itertools.count()
+        self._expiry: List[Tuple[float, int, str]] = []  # (ts, seq, post_id or "") min-heap
+        self._posts: Dict[str, list] = {}  # post_id -> [seq, ts, tickers, score, ncom, link, mentions, weight]
+        self._mention_events: Dict[int, list] = {}  # seq -> [ticker counts, weight]
+        self._totals: Dict[str, list] = {}  # ticker -> [mentions, upvotes, comments, live event count]
+        self._ticker_posts: Dict[str, Set[str]] = {}  # ticker -> post ids mentioning it
+        self._top: Dict[str, List[Tuple[int, str]]] = {}  # ticker -> min-heap of (score, post_id): top k + ties
+        self._order: Dict[str, object] = {}  # post_id -> tie-break rank (smaller ranks first)
+        self._dirty: Set[str] = set()
+        self._cutoff = float("-inf")
+        self._ref: Optional[float] = None  # decay reference time
+        self._now: Optional[float] = None
+
+    def _weight(self, ts: float) -> float:
+        if self.half_life_s is None:
+            return 1
+        if self._ref is None:
+            self._ref = ts
+        return 2.0 ** ((ts - self._ref) / self.half_life_s)
+
+    def _bump(self, t: str, mentions=0, upvotes=0, comments=0, events: int = 0) -> None:
+        tot = self._totals.get(t)
+        if tot is None:
+            tot = self._totals[t] = [0, 0, 0, 0]
+        tot[0] += mentions
+        tot[1] += upvotes
+        tot[2] += comments
+        tot[3] += events
+        self._dirty.add(t)
+
+    def _trim_top(self, heap: List[Tuple[int, str]]) -> None:
+        # Drop the lowest score while the rest still fill k slots (posts tied at the k-th score stay)
+        while len(heap) > self.k:
+            low = heap[0][0]
+            n_low = sum(1 for s, _ in heap if s == low)
+            if len(heap) - n_low < self.k:
+                break
+            for _ in range(n_low):
+                heapq.heappop(heap)
+
+    def _push_top(self, t: str, score: int, pid: str) -> None:
+        if self.k <= 0:
+            return
+        heap = self._top.setdefault(t, [])
+        if len(heap) < self.k or score >= heap[0][0]:
+            heapq.heappush(heap, (score, pid))
+            self._trim_top(heap)
+
+    def _rebuild_top(self, t: str) -> None:
+        pids = self._ticker_posts.get(t, ())
+        heap = [(self._posts[p][3], p) for p in pids if self._posts[p][5]]
+        heapq.heapify(heap)
+        self._trim_top(heap)
+        self._top[t] = heap
+
+    def add_post(
+        self,
+        post_id: str,
+        created_utc: float,
+        tickers: Iterable[str],
+        score: int,
+        num_comments: int,
+        permalink: Optional[str] = None,
+        mentions: Optional[Dict[str, int]] = None,
+        order=None,
+    ) -> None:
+        """
+        Add or update a post. tickers are the ones found in its title/selftext (they get its upvotes/comments);
+        mentions are occurrence counts attributed to the post (its content and comments). Re-adding replaces.
+        order ranks the post among equal-scored permalinks (e.g. its index in the crawl); it may change
+        on every call without the post being re-added.
+        """
+        tickers = frozenset(tickers)
+        score = int(score or 0)
+        num_comments = int(num_comments or 0)
+        mentions = {t: c for t, c in (mentions or {}).items() if c}
+        cur = self._posts.get(post_id)
+        if order is not None:
+            self._order[post_id] = order
+        if cur is not None and cur[1:7] == [float(created_utc), tickers, score, num_comments, permalink, mentions]:
+            return
+        if cur is not None:
+            self._remove_post(post_id)
+        if created_utc < self._cutoff:
+            return
+        if order is None:
+            self._order.setdefault(post_id, next(self._seq))
+        seq = next(self._seq)
+        w = self._weight(float(created_utc))
+        self._posts[post_id] = [seq, float(created_utc), tickers, score, num_comments, permalink, mentions, w]
+        heapq.heappush(self._expiry, (float(created_utc), seq, post_id))
+        for t in tickers:
+            self._bump(t, upvotes=score * w, comments=num_comments * w, events=1)
+            self._ticker_posts.setdefault(t, set()).add(post_id)
+            if permalink:
+                self._push_top(t, score, post_id)
+        for t, cnt in mentions.items():
+            self._bump(t, mentions=cnt * w, events=1)
+
+    def add_mentions(self, counts: Dict[str, int], ts: float) -> None:
+        """Add a batch of mentions not tied to a post (e.g. comments with their own timestamps)."""
+        if ts < self._cutoff or not counts:
+            return
+        seq = next(self._seq)
+        w = self._weight(float(ts))
+        self._mention_events[seq] = [dict(counts), w]
+        heapq.heappush(self._expiry, (float(ts), seq, ""))
+        for t, cnt in counts.items():
+            self._bump(t, mentions=cnt * w, events=1)
+
+    def remove_post(self, post_id: str) -> None:
+        """Drop a post (e.g. one that left the crawl) before it expires from the window."""
+        if post_id in self._posts:
+            self._remove_post(post_id)
+            self._order.pop(post_id, None)
+
+    def post_ids(self) -> Set[str]:
+        return set(self._posts)
+
+    def _remove_post(self, post_id: str) -> None:
+        _, _, tickers, score, ncom, _, mentions, w = self._posts.pop(post_id)
+        for t in tickers:
+            self._bump(t, upvotes=-score * w, comments=-ncom * w, events=-1)
+            pids = self._ticker_posts.get(t)
+            if pids is not None:
+                pids.discard(post_id)
+                if not pids:
+                    del self._ticker_posts[t]
+            if any(p == post_id for _, p in self._top.get(t, ())):
+                self._rebuild_top(t)
+        for t, cnt in mentions.items():
+            self._bump(t, mentions=-cnt * w, events=-1)
+
+    def _rebase(self, new_ref: float) -> None:
+        g = 2.0 ** ((self._ref - new_ref) / self.half_life_s)
+        for tot in self._totals.values():
+            tot[0] *= g
+            tot[1] *= g
+            tot[2] *= g
+        for post in self._posts.values():
+            post[7] *= g
+        for ev in self._mention_events.values():
+            ev[1] *= g
+        self._ref = new_ref
+
+    def advance(self, now: Optional[float] = None) -> None:
+        """Slide the window to end at now (epoch seconds), expiring older events."""
+        now = time.time() if now is None else float(now)
+        self._now = now if self._now is None else max(self._now, now)
+        self._cutoff = max(self._cutoff, now - self.window_s)
+        expiry = self._expiry
+        while expiry and expiry[0][0] < self._cutoff:
+            _, seq, pid = heapq.heappop(expiry)
+            if pid:
+                cur = self._posts.get(pid)
+                if cur is not None and cur[0] == seq:  # skip entries superseded by an update
+                    self.remove_post(pid)
+            else:
+                counts, w = self._mention_events.pop(seq, ({}, 0))
+                for t, cnt in counts.items():
+                    self._bump(t, mentions=-cnt * w, events=-1)
+        if self.half_life_s is not None and self._ref is not None:
+            if (self._now - self._ref) / self.half_life_s > self._REBASE_HALF_LIVES:
+                self._rebase(self._now)
+
+    def _score(self, t: str) -> dict:
+        tot = self._totals.get(t)
+        if not tot or not tot[3]:
+            mentions = upvotes = comments = 0
+        elif self.half_life_s is None:
+            mentions, upvotes, comments = tot[0], tot[1], tot[2]
+        else:
+            # Everything was stored relative to _ref; one factor brings it to the current time
+            g = 2.0 ** ((self._ref - self._now) / self.half_life_s) if self._now is not None else 1.0
+            mentions, upvotes, comments = tot[0] * g, tot[1] * g, tot[2] * g
+        top = sorted(self._top.get(t, ()), key=lambda e: (-e[0], self._order.get(e[1], 0)))[:self.k]
+        return {
+            "mentions": mentions,
+            "upvotes": upvotes,
+            "comments": comments,
+            "hotness": float(self.w_mentions * mentions + self.w_upvotes * upvotes + self.w_comments * comments),
+            "permalinks": [self._posts[p][5] for _, p in top],
+        }
+
+    def scores(self) -> Dict[str, dict]:
+        """
+        Return ticker -> metrics (same shape as aggregate_and_score) for tickers changed since the last call.
+        Tickers that dropped out of the window are reported once with zero metrics, then forgotten.
+        In decay mode values are as of the last advance(); unchanged tickers all scale by the same factor.
+        """
+        out: Dict[str, dict] = {}
+        for t in self._dirty:
+            out[t] = self._score(t)
+            tot = self._totals.get(t)
+            if tot is not None and not tot[3]:
+                del self._totals[t]
+                self._top.pop(t, None)
+        self._dirty.clear()
+        return out
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Return metrics for every ticker currently in the window."""
+        return {t: self._score(t) for t in self._totals if self._totals[t][3]}
@@ -1,7 +1,14 @@
 import json
 import os
+import struct
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Fixed-size binary stream record: ticker (8 bytes, NUL padded ASCII), run time (epoch seconds),
+# hotness, mentions, total_upvotes, total_comments. 48 bytes, little-endian, so files can be
+# memory-mapped (e.g. numpy dtype "<S8,<f8,<f8,<i8,<i8,<i8") and read from any record boundary.
+RECORD_STRUCT = struct.Struct("<8sddqqq")
 
 
 def _ensure_dir(path: str) -> None:
@@ -22,3 +29,121 @@ def write_output(path: str, payload: Dict[str, Any]) -> None:
     with open(path, "w", encoding="utf-8") as f:
         json.dump(out, f, ensure_ascii=False, indent=2)
 
+
+def _rotate(path: str, backups: int) -> None:
+    """Shift path -> path.1 -> ... -> path.N with atomic renames; the oldest backup is dropped."""
+    if backups <= 0:
+        os.remove(path)
+        return
+    for i in range(backups - 1, 0, -1):
+        src = f"{path}.{i}"
+        if os.path.exists(src):
+            os.replace(src, f"{path}.{i + 1}")
+    os.replace(path, f"{path}.1")
+
+
+def append_snapshot(
+    path: str,
+    payload: Dict[str, Any],
+    fmt: str = "jsonl",
+    max_bytes: int = 64 * 1024 * 1024,
+    backups: int = 3,
+) -> int:
+    """
+    Append one record per ticker for this run to an append-only stream, returning the records written.
+    - fmt="jsonl": one compact JSON object per line (run_at, window_hours, threshold, ticker, metrics, permalinks).
+    - fmt="binary": fixed-size RECORD_STRUCT records (no permalinks).
+    Each run is written with a single append, and the file is rotated before it would exceed max_bytes,
+    so readers tailing it only ever see whole runs appended.
+    """
+    items = payload.get("items") or []
+    if not items:
+        return 0
+    run_at = time.time()
+    if fmt == "binary":
+        data = b"".join(
+            RECORD_STRUCT.pack(
+                it["ticker"].encode("ascii", errors="ignore")[:8],
+                run_at,
+                float(it.get("hotness", 0.0)),
+                int(it.get("mentions", 0)),
+                int(it.get("total_upvotes", 0)),
+                int(it.get("total_comments", 0)),
+            )
+            for it in items
+        )
+    elif fmt == "jsonl":
+        run_iso = datetime.fromtimestamp(run_at, timezone.utc).isoformat()
+        lines = []
+        for it in items:
+            rec = {"run_at": run_iso, "window_hours": payload.get("window_hours"), "threshold": payload.get("threshold")}
+            rec.update(it)
+            lines.append(json.dumps(rec, ensure_ascii=False, separators=(",", ":")))
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+    else:
+        raise ValueError(f"Unknown stream format: {fmt!r}")
+
+    _ensure_dir(path)
+    if os.path.exists(path) and os.path.getsize(path) + len(data) > max_bytes:
+        _rotate(path, backups)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    return len(items)
+
+
+def _read_records(path: str, offset: int, fmt: str) -> Tuple[List[Dict[str, Any]], int]:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        chunk = f.read()
+    records: List[Dict[str, Any]] = []
+    if fmt == "binary":
+        size = RECORD_STRUCT.size
+        usable = len(chunk) - len(chunk) % size
+        for ticker, run_at, hotness, mentions, upvotes, comments in RECORD_STRUCT.iter_unpack(chunk[:usable]):
+            records.append({
+                "ticker": ticker.rstrip(b"\0").decode("ascii"),
+                "run_at": datetime.fromtimestamp(run_at, timezone.utc).isoformat(),
+                "hotness": hotness,
+                "mentions": mentions,
+                "total_upvotes": upvotes,
+                "total_comments": comments,
+            })
+        return records, offset + usable
+    if fmt != "jsonl":
+        raise ValueError(f"Unknown stream format: {fmt!r}")
+    end = chunk.rfind(b"\n") + 1
+    for line in chunk[:end].splitlines():
+        if line:
+            records.append(json.loads(line))
+    return records, offset + end
+
+
+def read_snapshot_stream(
+    path: str,
+    cursor: Optional[Tuple[int, int]] = None,
+    fmt: str = "jsonl",
+) -> Tuple[List[Dict[str, Any]], Optional[Tuple[int, int]]]:
+    """
+    Read complete records appended since cursor; returns (records, new_cursor) for incremental tailing.
+    The cursor is (inode, offset). A partially written trailing record is left for the next call.
+    If the file was rotated since the last call, the rest of the rotated file (path.1) is read first.
+    """
+    if not os.path.exists(path):
+        return [], cursor
+    ino = os.stat(path).st_ino
+    records: List[Dict[str, Any]] = []
+    offset = 0
+    if cursor is not None:
+        old_ino, old_offset = cursor
+        if old_ino == ino:
+            offset = old_offset
+        else:
+            prev = f"{path}.1"
+            if os.path.exists(prev) and os.stat(prev).st_ino == old_ino:
+                records, _ = _read_records(prev, old_offset, fmt)
+    more, offset = _read_records(path, offset, fmt)
+    records.extend(more)
+    return records, (ino, offset)
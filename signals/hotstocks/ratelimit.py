@@ -0,0 +1,88 @@
+import random
+import threading
+import time
+from typing import Mapping, Optional
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every Reddit request.
+    - acquire() blocks until a token is available (rate tokens/sec, up to burst saved up).
+    - observe() adapts the rate to Reddit's X-Ratelimit-Remaining / X-Ratelimit-Reset headers,
+      spreading the remaining budget over the time left in the window.
+    - penalize() pauses everyone after a 429 (honoring Retry-After when present).
+    - backoff_delay() gives jittered exponential backoff for retries.
+    """
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: int = 10,
+        min_rate: float = 0.05,
+        max_rate: float = 10.0,
+        backoff_base: float = 0.8,
+        backoff_max: float = 30.0,
+    ):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        """Take one token, sleeping (outside the lock) until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                else:
+                    wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def observe(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Adapt to the server's rate-limit headers, if present."""
+        if not headers:
+            return
+        try:
+            remaining = float(headers.get("X-Ratelimit-Remaining"))
+            reset = float(headers.get("X-Ratelimit-Reset"))
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if remaining < 1.0:
+                self._blocked_until = max(self._blocked_until, now + reset)
+                self._tokens = 0.0
+                return
+            # Keep a small margin so concurrent in-flight requests don't overshoot the budget
+            target = 0.9 * remaining / max(reset, 1.0)
+            self.rate = min(self.max_rate, max(self.min_rate, target))
+            self._tokens = min(self._tokens, remaining)
+
+    def penalize(self, retry_after: Optional[float] = None) -> None:
+        """Pause all callers after a 429: for Retry-After seconds, or a jittered backoff step."""
+        delay = float(retry_after) if retry_after is not None else self.backoff_delay(1)
+        with self._lock:
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + delay)
+            self._tokens = 0.0
+            self.rate = max(self.min_rate, self.rate / 2.0)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff: uniform(0, min(max, base * 2**attempt))."""
+        return random.uniform(0.0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
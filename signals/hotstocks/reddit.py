@@ -1,30 +1,204 @@
 import json
+import socket
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Iterable, List, Optional
-from urllib.error import HTTPError, URLError
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.error import HTTPError
+from urllib.parse import urlencode, urljoin, urlsplit
+
+from .ratelimit import RateLimiter
 
 
 BASE = "https://www.reddit.com"
 USER_AGENT = "HotStocksPipeline/0.1 (by u/anonymous)"
+TIMEOUT_S = 15
+
+
+class _ConnectionPool:
+    """
+    Keep-alive connections shared by all fetch threads, keyed by (scheme, host).
+    A worker checks a connection out for one request and returns it if the server kept it open.
+    """
+
+    def __init__(self, max_idle_per_host: int = 16):
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: Dict[Tuple[str, str], List[HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def checkout(self, scheme: str, netloc: str) -> Tuple[HTTPConnection, bool]:
+        """Return (connection, reused) for the host, opening a new one if none is idle."""
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+        return self.connect(scheme, netloc), False
+
+    @staticmethod
+    def connect(scheme: str, netloc: str) -> HTTPConnection:
+        cls = HTTPSConnection if scheme == "https" else HTTPConnection
+        return cls(netloc, timeout=TIMEOUT_S)
+
+    def checkin(self, scheme: str, netloc: str, conn: HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for c in conns:
+            c.close()
+
+
+class _ValidatorCache:
+    """Bounded LRU of url -> (ETag, Last-Modified, decoded body) for conditional GETs."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Tuple[Optional[str], Optional[str], object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str):
+        with self._lock:
+            item = self._items.get(url)
+            if item is not None:
+                self._items.move_to_end(url)
+            return item
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], data) -> None:
+        with self._lock:
+            self._items[url] = (etag, last_modified, data)
+            self._items.move_to_end(url)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+_POOL = _ConnectionPool()
+_VALIDATORS = _ValidatorCache()
+_LIMITER = RateLimiter()
+_LIMITER_SETTINGS = (2.0, 10, 10.0)
+
+
+def configure_rate_limit(requests_per_second: float = 2.0, burst: int = 10, max_requests_per_second: float = 10.0) -> None:
+    """
+    Replace the shared limiter used by every Reddit request (e.g. from config at pipeline start).
+    Unchanged settings keep the current limiter, so a run doesn't discard the rate learned from
+    the server's headers or a pending 429 pause.
+    """
+    global _LIMITER, _LIMITER_SETTINGS
+    settings = (float(requests_per_second), int(burst), float(max_requests_per_second))
+    if settings == _LIMITER_SETTINGS:
+        return
+    _LIMITER = RateLimiter(rate=settings[0], burst=settings[1], max_rate=settings[2])
+    _LIMITER_SETTINGS = settings
+
+# Errors that mean a reused keep-alive connection was closed by the server while idle
+_STALE_CONN_ERRORS = (ConnectionResetError, BrokenPipeError, HTTPException)
+
+
+def _quickack(conn: HTTPConnection) -> None:
+    """
+    Ask Linux to ACK the response right away. On a reused connection the kernel otherwise
+    delays the ACK, and a server that writes headers and body separately (Nagle on) stalls
+    ~40 ms per request waiting for it. The flag is one-shot, so it is set before every response.
+    """
+    if conn.sock is not None and hasattr(socket, "TCP_QUICKACK"):
+        try:
+            conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+        except OSError:
+            pass
+
+
+def _get_once(url: str):
+    """
+    One GET over a pooled connection, following up to 3 redirects.
+    Sends If-None-Match/If-Modified-Since when validators are cached and returns the cached body on 304.
+    JSON is decoded straight from the response stream.
+    """
+    for _ in range(4):
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        headers = {"User-Agent": USER_AGENT, "Accept": "application/json"}
+        cached = _VALIDATORS.get(url)
+        if cached:
+            if cached[0]:
+                headers["If-None-Match"] = cached[0]
+            if cached[1]:
+                headers["If-Modified-Since"] = cached[1]
+
+        _LIMITER.acquire()
+        conn, reused = _POOL.checkout(parts.scheme, parts.netloc)
+        try:
+            try:
+                conn.request("GET", path, headers=headers)
+                _quickack(conn)
+                resp = conn.getresponse()
+            except _STALE_CONN_ERRORS:
+                if not reused:
+                    raise
+                # Idle connection went away; retry once on a fresh one (it is a new request, so it takes a token)
+                conn.close()
+                _LIMITER.acquire()
+                conn = _POOL.connect(parts.scheme, parts.netloc)
+                conn.request("GET", path, headers=headers)
+                _quickack(conn)
+                resp = conn.getresponse()
+
+            if resp.status == 200:
+                data = json.load(resp)
+            else:
+                resp.read()  # drain so the connection can be reused
+        except BaseException:
+            conn.close()
+            raise
+
+        _LIMITER.observe(resp.headers)
+        if resp.will_close:
+            conn.close()
+        else:
+            _POOL.checkin(parts.scheme, parts.netloc, conn)
+
+        if resp.status == 200:
+            etag, last_modified = resp.getheader("ETag"), resp.getheader("Last-Modified")
+            if etag or last_modified:
+                _VALIDATORS.put(url, etag, last_modified, data)
+            return data
+        if resp.status == 304 and cached:
+            return cached[2]
+        if resp.status in (301, 302, 303, 307, 308) and resp.getheader("Location"):
+            url = urljoin(url, resp.getheader("Location"))
+            continue
+        raise HTTPError(url, resp.status, resp.reason, resp.headers, None)
+    raise HTTPError(url, 310, "Too many redirects", None, None)
 
 
-def _http_get_json(url: str, params: Optional[Dict[str, str]] = None, retries: int = 3, sleep_s: float = 0.8):
+def _http_get_json(url: str, params: Optional[Dict[str, str]] = None, retries: int = 3):
     if params:
         url = f"{url}?{urlencode(params)}"
     last_err = None
     for i in range(retries):
         try:
-            req = Request(url, headers={"User-Agent": USER_AGENT})
-            with urlopen(req, timeout=15) as resp:
-                if resp.status != 200:
-                    raise HTTPError(url, resp.status, resp.reason, resp.headers, None)
-                return json.loads(resp.read().decode("utf-8", errors="ignore"))
-        except (HTTPError, URLError, TimeoutError) as e:
+            return _get_once(url)
+        except (HTTPError, HTTPException, OSError) as e:
             last_err = e
-            time.sleep(sleep_s * (1 + i))
+            if isinstance(e, HTTPError) and e.code == 429:
+                retry_after = e.headers.get("Retry-After") if e.headers else None
+                try:
+                    _LIMITER.penalize(float(retry_after) if retry_after else None)
+                except ValueError:
+                    _LIMITER.penalize()
+            elif i + 1 < retries:
+                time.sleep(_LIMITER.backoff_delay(i))
     if last_err:
         raise last_err
 
@@ -33,9 +207,29 @@ def _now_utc() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def fetch_recent_posts(sub: str, lookback_hours: int = 24, limit: int = 100) -> List[Dict]:
+def _post_from_listing(d: Dict) -> Dict:
+    return {
+        "id": d.get("id"),
+        "title": d.get("title"),
+        "selftext": d.get("selftext"),
+        "score": d.get("score"),
+        "num_comments": d.get("num_comments"),
+        "permalink": d.get("permalink"),
+        "subreddit": d.get("subreddit"),
+        "created_utc": d.get("created_utc"),
+    }
+
+
+def fetch_recent_posts(
+    sub: str,
+    lookback_hours: int = 24,
+    limit: int = 100,
+    base: str = BASE,
+    stop_at: Optional[str] = None,
+) -> List[Dict]:
     """
     Fetch recent posts for a subreddit via public JSON. Stops at lookback window or after limit.
+    If stop_at is a post fullname (t3_xxx), also stops when that post is reached, so only newer posts are returned.
     """
     collected: List[Dict] = []
     after: Optional[str] = None
@@ -47,7 +241,7 @@ def fetch_recent_posts(sub: str, lookback_hours: int = 24, limit: int = 100) ->
         params = {"limit": str(page_limit)}
         if after:
             params["after"] = after
-        url = f"{BASE}/r/{sub}/new.json"
+        url = f"{base}/r/{sub}/new.json"
         data = _http_get_json(url, params)
         children = (data or {}).get("data", {}).get("children", [])
         if not children:
@@ -61,27 +255,35 @@ def fetch_recent_posts(sub: str, lookback_hours: int = 24, limit: int = 100) ->
             if created_dt < window_start:
                 # Stop early if we've reached outside the window
                 return collected
-            post = {
-                "id": d.get("id"),
-                "title": d.get("title"),
-                "selftext": d.get("selftext"),
-                "score": d.get("score"),
-                "num_comments": d.get("num_comments"),
-                "permalink": d.get("permalink"),
-                "subreddit": d.get("subreddit"),
-                "created_utc": created_utc,
-            }
-            collected.append(post)
+            if stop_at and d.get("name", f"t3_{d.get('id')}") == stop_at:
+                # Everything from here on was seen by a previous crawl
+                return collected
+            collected.append(_post_from_listing(d))
             fetched += 1
             if fetched >= limit:
                 break
         after = (data or {}).get("data", {}).get("after")
         if not after:
             break
-        time.sleep(0.5)
     return collected
 
 
+def fetch_posts_by_id(fullnames: List[str], base: str = BASE) -> List[Dict]:
+    """
+    Fetch current data (score, num_comments, ...) for known posts via /by_id, 100 fullnames per request.
+    Deleted or unknown posts are simply absent from the result.
+    """
+    out: List[Dict] = []
+    for i in range(0, len(fullnames), 100):
+        chunk = fullnames[i:i + 100]
+        data = _http_get_json(f"{base}/by_id/{','.join(chunk)}.json")
+        for ch in (data or {}).get("data", {}).get("children", []):
+            d = ch.get("data", {})
+            if d.get("id") and d.get("created_utc") is not None:
+                out.append(_post_from_listing(d))
+    return out
+
+
 def _walk_comments(nodes: Iterable[Dict], out: List[str], limit: int) -> None:
     for n in nodes:
         if len(out) >= limit:
@@ -103,13 +305,13 @@ def _walk_comments(nodes: Iterable[Dict], out: List[str], limit: int) -> None:
             _walk_comments(replies.get("data", {}).get("children", []), out, limit)
 
 
-def fetch_comments_for_post(permalink: str, limit: int = 200) -> List[str]:
+def fetch_comments_for_post(permalink: str, limit: int = 200, base: str = BASE) -> List[str]:
     """
     Fetch a subset of comments for a post via public JSON, returns bodies.
     """
     if not permalink:
         return []
-    url = f"{BASE}{permalink}.json"
+    url = f"{base}{permalink}.json"
     data = _http_get_json(url, params={"sort": "top", "limit": str(min(500, limit))})
     if not isinstance(data, list) or len(data) < 2:
         return []
@@ -119,3 +321,52 @@ def fetch_comments_for_post(permalink: str, limit: int = 200) -> List[str]:
     _walk_comments(children, bodies, limit)
     return bodies
 
+
+def fetch_posts_for_subs(
+    subs: List[str],
+    lookback_hours: int = 24,
+    limit: int = 100,
+    max_workers: int = 8,
+    base: str = BASE,
+) -> List[Dict]:
+    """
+    Fetch recent posts for several subreddits concurrently (one worker per sub, bounded by max_workers).
+    Results keep the order of `subs`; a failing sub raises like fetch_recent_posts does.
+    """
+    if not subs:
+        return []
+    workers = max(1, min(int(max_workers), len(subs)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pages = pool.map(lambda s: fetch_recent_posts(s, lookback_hours=lookback_hours, limit=limit, base=base), subs)
+        out: List[Dict] = []
+        for posts in pages:
+            out.extend(posts)
+    return out
+
+
+def fetch_comments_for_posts(
+    permalinks: Iterable[str],
+    limit: int = 200,
+    max_workers: int = 8,
+    base: str = BASE,
+    drop_failed: bool = False,
+) -> Dict[str, List[str]]:
+    """
+    Fetch comment bodies for many posts on a bounded thread pool.
+    Returns permalink -> bodies; posts whose fetch failed map to an empty list,
+    or are left out entirely when drop_failed=True.
+    """
+    links = [pl for pl in dict.fromkeys(permalinks) if pl]
+    if not links:
+        return {}
+
+    def _one(pl: str) -> Optional[List[str]]:
+        try:
+            return fetch_comments_for_post(pl, limit=limit, base=base)
+        except Exception:
+            return None if drop_failed else []
+
+    workers = max(1, min(int(max_workers), len(links)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = dict(zip(links, pool.map(_one, links)))
+    return {pl: bodies for pl, bodies in results.items() if bodies is not None}
@@ -0,0 +1,147 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .reddit import configure_rate_limit, fetch_comments_for_posts, fetch_posts_for_subs
+from .state import CrawlState, incremental_crawl
+from .tickers import get_extractor
+
+
+class CrawlSnapshot:
+    """
+    Result of one crawl, shared by run_pipeline, get_hot_tickers and find_posts_with_tickers.
+    - posts: fetched posts in fetch order
+    - post_counts: post_id -> ticker counts in title/selftext (stopwords and blacklist applied, no whitelist)
+    - index: inverted index ticker -> post ids whose content mentions it
+    - comments(): permalink -> comment bodies, fetched on first use and then kept
+    """
+
+    def __init__(
+        self,
+        posts: List[Dict],
+        blacklist: Optional[set] = None,
+        comments: Optional[Dict[str, List[str]]] = None,
+        comments_loader: Optional[Callable[[List[Dict]], Dict[str, List[str]]]] = None,
+    ):
+        self.posts = posts
+        self.created_at = time.time()
+        extractor = get_extractor(None, blacklist)
+        self.post_counts: Dict[str, Dict[str, int]] = {}
+        self.index: Dict[str, List[str]] = {}
+        for p in posts:
+            pid = p.get("id")
+            counts = extractor.counts(f"{p.get('title') or ''}\n{p.get('selftext') or ''}")
+            self.post_counts[pid] = counts
+            for t in counts:
+                self.index.setdefault(t, []).append(pid)
+        self._comments = comments
+        self._comments_loader = comments_loader
+        self._lock = threading.Lock()
+
+    def comments(self) -> Dict[str, List[str]]:
+        with self._lock:
+            if self._comments is None:
+                self._comments = self._comments_loader(self.posts) if self._comments_loader else {}
+            return self._comments
+
+    def posts_with_tickers(self, tickers) -> List[Tuple[Dict, List[str]]]:
+        """Return (post, tickers found) for posts mentioning any of tickers, in fetch order, via the index."""
+        wanted = {t.upper() for t in tickers}
+        found: Dict[str, List[str]] = {}
+        for t in wanted:
+            for pid in self.index.get(t, ()):
+                found.setdefault(pid, []).append(t)
+        return [(p, found[p.get("id")]) for p in self.posts if p.get("id") in found]
+
+
+def build_snapshot(cfg: dict) -> CrawlSnapshot:
+    """Crawl the configured subreddits once (incrementally when state_path is set)."""
+    subs = cfg["subs"]
+    lookback_hours = int(cfg.get("lookback_hours", 240))
+    limits = cfg.get("limits", {})
+    posts_per_sub = int(limits.get("posts_per_sub", 100))
+    comments_per_post = int(limits.get("comments_per_post", 200))
+    max_workers = int(limits.get("max_concurrent_requests", 8))
+    base_url = cfg.get("base_url", "https://www.reddit.com")
+    rate_limit = cfg.get("rate_limit", {})
+    configure_rate_limit(
+        requests_per_second=float(rate_limit.get("requests_per_second", 2.0)),
+        burst=int(rate_limit.get("burst", 10)),
+        max_requests_per_second=float(rate_limit.get("max_requests_per_second", 10.0)),
+    )
+    blacklist = set(map(str.upper, cfg.get("ticker_blacklist", [])))
+
+    state_path = cfg.get("state_path")
+    if state_path:
+        # Incremental crawl: only new posts and posts with new comments hit the network
+        with CrawlState(state_path) as state:
+            all_posts, comments_by_link = incremental_crawl(
+                state,
+                subs,
+                lookback_hours=lookback_hours,
+                posts_per_sub=posts_per_sub,
+                comments_per_post=comments_per_post,
+                max_workers=max_workers,
+                base=base_url,
+            )
+        return CrawlSnapshot(all_posts, blacklist=blacklist, comments=comments_by_link)
+
+    all_posts = fetch_posts_for_subs(
+        subs, lookback_hours=lookback_hours, limit=posts_per_sub, max_workers=max_workers, base=base_url
+    )
+
+    def load_comments(posts: List[Dict]) -> Dict[str, List[str]]:
+        return fetch_comments_for_posts(
+            (p.get("permalink") for p in posts),
+            limit=comments_per_post,
+            max_workers=max_workers,
+            base=base_url,
+        )
+
+    return CrawlSnapshot(all_posts, blacklist=blacklist, comments_loader=load_comments)
+
+
+_CACHE: Dict[tuple, Tuple[float, CrawlSnapshot]] = {}
+_CACHE_LOCK = threading.Lock()  # guards _CACHE and _BUILD_LOCKS only, never held during a crawl
+_BUILD_LOCKS: Dict[tuple, threading.Lock] = {}  # one per config key: concurrent misses wait for one crawl
+
+
+def _cache_key(cfg: dict) -> tuple:
+    limits = cfg.get("limits", {})
+    return (
+        tuple(cfg["subs"]),
+        int(cfg.get("lookback_hours", 240)),
+        int(limits.get("posts_per_sub", 100)),
+        int(limits.get("comments_per_post", 200)),
+        cfg.get("base_url", "https://www.reddit.com"),
+        cfg.get("state_path"),
+        tuple(sorted(map(str.upper, cfg.get("ticker_blacklist", [])))),
+    )
+
+
+def get_snapshot(cfg: dict, max_age_s: Optional[float] = None) -> CrawlSnapshot:
+    """
+    Return a crawl snapshot for cfg, reusing the in-memory one if it is younger than the TTL
+    (max_age_s, else cfg snapshot_ttl_seconds). Concurrent callers wait for a single crawl.
+    """
+    ttl = float(cfg.get("snapshot_ttl_seconds", 300) if max_age_s is None else max_age_s)
+    key = _cache_key(cfg)
+
+    def fresh() -> Optional[CrawlSnapshot]:
+        with _CACHE_LOCK:
+            hit = _CACHE.get(key)
+        return hit[1] if hit is not None and time.monotonic() - hit[0] < ttl else None
+
+    snap = fresh()
+    if snap is not None:
+        return snap
+    with _CACHE_LOCK:
+        build_lock = _BUILD_LOCKS.setdefault(key, threading.Lock())
+    # Crawls for other configs, and reads of fresh snapshots, don't wait on this one
+    with build_lock:
+        snap = fresh()  # another caller may have finished the crawl while we waited
+        if snap is None:
+            snap = build_snapshot(cfg)
+            with _CACHE_LOCK:
+                _CACHE[key] = (time.monotonic(), snap)
+        return snap
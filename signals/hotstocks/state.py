@@ -0,0 +1,195 @@
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .io import _ensure_dir
+from .reddit import BASE, fetch_comments_for_posts, fetch_posts_by_id, fetch_recent_posts
+
+
+_POST_FIELDS = ("id", "subreddit", "title", "selftext", "score", "num_comments", "permalink", "created_utc")
+
+
+class CrawlState:
+    """
+    On-disk crawl state (SQLite) so repeated runs only fetch what changed.
+    - posts: one row per post id with last-seen score/num_comments and the cached comment bodies
+      (comments_num is the num_comments value the cached bodies were fetched at; NULL = never fetched).
+    - cursors: newest-seen post fullname per configured subreddit.
+    """
+
+    def __init__(self, path: str):
+        _ensure_dir(path)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS posts (
+                id TEXT PRIMARY KEY,
+                sub TEXT NOT NULL,
+                subreddit TEXT,
+                title TEXT,
+                selftext TEXT,
+                score INTEGER,
+                num_comments INTEGER,
+                permalink TEXT,
+                created_utc REAL NOT NULL,
+                comments_num INTEGER,
+                comments TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_posts_sub_created ON posts (sub, created_utc);
+            CREATE TABLE IF NOT EXISTS cursors (
+                sub TEXT PRIMARY KEY,
+                newest_fullname TEXT
+            );
+            """
+        )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "CrawlState":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get_cursor(self, sub: str) -> Optional[str]:
+        row = self.conn.execute("SELECT newest_fullname FROM cursors WHERE sub=?", (sub,)).fetchone()
+        return row[0] if row else None
+
+    def set_cursor(self, sub: str, fullname: str) -> None:
+        with self.conn:
+            self.conn.execute("REPLACE INTO cursors (sub, newest_fullname) VALUES (?, ?)", (sub, fullname))
+
+    def upsert_posts(self, sub: str, posts: Iterable[Dict]) -> None:
+        """Insert new posts or refresh metrics of known ones; cached comments are kept."""
+        rows = [
+            (p["id"], sub, p.get("subreddit"), p.get("title"), p.get("selftext"), int(p.get("score") or 0),
+             int(p.get("num_comments") or 0), p.get("permalink"), float(p["created_utc"]))
+            for p in posts
+            if p.get("id") and p.get("created_utc") is not None
+        ]
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO posts (id, sub, subreddit, title, selftext, score, num_comments, permalink, created_utc)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    title=excluded.title, selftext=excluded.selftext,
+                    score=excluded.score, num_comments=excluded.num_comments
+                """,
+                rows,
+            )
+
+    def posts_in_window(self, sub: str, since_utc: float, limit: int) -> List[Dict]:
+        """Newest-first posts for sub created at or after since_utc, in fetch_recent_posts' shape."""
+        rows = self.conn.execute(
+            f"SELECT {', '.join(_POST_FIELDS)} FROM posts WHERE sub=? AND created_utc>=? "
+            "ORDER BY created_utc DESC LIMIT ?",
+            (sub, since_utc, limit),
+        ).fetchall()
+        return [dict(zip(_POST_FIELDS, r)) for r in rows]
+
+    def posts_needing_comments(self, post_ids: Iterable[str]) -> List[str]:
+        """Ids whose comments were never fetched or whose num_comments grew since."""
+        ids = list(post_ids)
+        due: List[str] = []
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            due.extend(
+                r[0]
+                for r in self.conn.execute(
+                    f"SELECT id FROM posts WHERE id IN ({marks}) "
+                    "AND (comments_num IS NULL OR num_comments > comments_num)",
+                    chunk,
+                )
+            )
+        return due
+
+    def save_comments(self, items: Iterable[Tuple[str, List[str]]]) -> None:
+        """Store comment bodies per post id, stamped with the post's current num_comments."""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE posts SET comments=?, comments_num=num_comments WHERE id=?",
+                [(json.dumps(bodies, ensure_ascii=False), pid) for pid, bodies in items],
+            )
+
+    def cached_comments(self, post_ids: Iterable[str]) -> Dict[str, List[str]]:
+        ids = list(post_ids)
+        out: Dict[str, List[str]] = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for pid, raw in self.conn.execute(
+                f"SELECT id, comments FROM posts WHERE id IN ({marks}) AND comments IS NOT NULL", chunk
+            ):
+                out[pid] = json.loads(raw)
+        return out
+
+    def prune(self, before_utc: float) -> None:
+        """Drop posts that fell out of the lookback window."""
+        with self.conn:
+            self.conn.execute("DELETE FROM posts WHERE created_utc < ?", (before_utc,))
+
+
+def incremental_crawl(
+    state: CrawlState,
+    subs: List[str],
+    *,
+    lookback_hours: int,
+    posts_per_sub: int,
+    comments_per_post: int,
+    max_workers: int = 8,
+    base: str = BASE,
+) -> Tuple[List[Dict], Dict[str, List[str]]]:
+    """
+    Crawl using the stored state and return (all_posts, permalink -> comment bodies) like a full crawl would.
+    - New posts: /new listing, stopping at each sub's newest-seen fullname.
+    - Known posts still in the window: score/num_comments refreshed in bulk via /by_id.
+    - Comments: fetched only for new posts and posts whose num_comments grew; others come from the cache.
+    """
+    window_start = time.time() - lookback_hours * 3600
+    state.prune(window_start)
+    cursors = {sub: state.get_cursor(sub) for sub in subs}
+
+    workers = max(1, min(int(max_workers), len(subs) or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        new_posts = list(pool.map(
+            lambda s: fetch_recent_posts(
+                s, lookback_hours=lookback_hours, limit=posts_per_sub, base=base, stop_at=cursors[s]
+            ),
+            subs,
+        ))
+
+    seen_ids = set()
+    known: Dict[str, List[str]] = {}
+    for sub, posts in zip(subs, new_posts):
+        state.upsert_posts(sub, posts)
+        if posts:
+            state.set_cursor(sub, f"t3_{posts[0]['id']}")
+        seen_ids.update(p["id"] for p in posts)
+        known[sub] = [
+            f"t3_{p['id']}" for p in state.posts_in_window(sub, window_start, posts_per_sub) if p["id"] not in seen_ids
+        ]
+
+    # Refresh metrics for posts we already had; /by_id takes 100 at a time
+    for sub, fullnames in known.items():
+        if fullnames:
+            state.upsert_posts(sub, fetch_posts_by_id(fullnames, base=base))
+
+    all_posts: List[Dict] = []
+    for sub in subs:
+        all_posts.extend(state.posts_in_window(sub, window_start, posts_per_sub))
+
+    links = {p["id"]: p.get("permalink") for p in all_posts}
+    due = state.posts_needing_comments(links)
+    fetched = fetch_comments_for_posts(
+        (links[pid] for pid in due), limit=comments_per_post, max_workers=max_workers, base=base, drop_failed=True
+    )
+    state.save_comments((pid, fetched[links[pid]]) for pid in due if links[pid] in fetched)
+
+    cached = state.cached_comments(links)
+    comments_by_link = {links[pid]: bodies for pid, bodies in cached.items()}
+    return all_posts, comments_by_link
@@ -1,27 +1,169 @@
 import re
-from typing import Dict, Iterable, Optional, Set
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
 
 
-_DOLLAR_TICKER = re.compile(r"\$([A-Za-z]{1,5})\b")
-_BARE_TICKER = re.compile(r"\b([A-Z]{1,5})\b")
+# One alternation instead of separate $-prefixed and bare passes: group 1 is a
+# $AAPL style symbol (any case), group 2 a bare uppercase word of up to 5 chars.
+_ANY_TICKER = re.compile(r"\$([A-Za-z]{1,5})\b|\b([A-Z]{1,5})\b")
 
 # Conservative stopwords to reduce obvious false positives.
 _STOPWORDS: Set[str] = {
     "I", "A", "AN", "AND", "OR", "THE", "TO", "YOLO", "USA", "USD",
     "SEC", "CEO", "CFO", "ETF", "GDP", "CPI", "FOMC", "AI", "WSB",
-    "S", "U", "US", "EDIT", "ALL", "ARE", "WITH", "VERY", "TRADE", 
+    "S", "U", "US", "EDIT", "ALL", "ARE", "WITH", "VERY", "TRADE",
     "FAKE", "OF", "EPS", "EPG", "DD", "RFK", "AMA", "CNBC", "P",
     "D", "BUT", "IIRC", "RIP"
 }
 
 
-def _normalize(candidate: str) -> Optional[str]:
-    t = candidate.upper()
-    if not (1 <= len(t) <= 5):
-        return None
-    if t in _STOPWORDS:
-        return None
-    return t
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Render a set of symbols as a trie-shaped regex (shared prefixes factored out),
+    so the regex engine walks it like an automaton instead of trying each symbol.
+    """
+    trie: Dict[str, dict] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        leaves = []
+        branches = []
+        for ch in sorted(k for k in node if k):
+            child = node[ch]
+            if list(child) == [""]:
+                leaves.append(ch)
+            else:
+                branches.append(ch + render(child))
+        if leaves:
+            branches.append(leaves[0] if len(leaves) == 1 else "[" + "".join(leaves) + "]")
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            body = f"(?:{body})?"
+        return body
+
+    return render(trie)
+
+
+class TickerExtractor:
+    """
+    Single-pass ticker scanner with precompiled white/black list handling.
+    - Without a whitelist, scans with the generic $SYM / bare SYM pattern and filters stopwords + blacklist.
+    - With a whitelist, compiles the accepted symbols into a trie regex so only valid symbols ever match.
+    """
+
+    def __init__(self, whitelist: Optional[Iterable[str]] = None, blacklist: Optional[Iterable[str]] = None):
+        rejected = set(_STOPWORDS)
+        if blacklist:
+            rejected.update(s.upper() for s in blacklist)
+        self._rejected = frozenset(rejected)
+        self._whitelisted = whitelist is not None
+        if whitelist is None:
+            self._pattern = _ANY_TICKER
+        else:
+            accepted = {s.upper() for s in whitelist}
+            accepted = sorted(s for s in accepted if s.isalpha() and 1 <= len(s) <= 5 and s not in self._rejected)
+            if accepted:
+                trie = _trie_pattern(accepted)
+                self._pattern = re.compile(rf"\$((?i:{trie}))\b|\b({trie})\b")
+            else:
+                self._pattern = None
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """
+        Return ticker -> occurrence count for text in one scan.
+        A $-prefixed uppercase symbol counts twice ($-form and bare form), as it always has.
+        """
+        counts: Dict[str, int] = {}
+        if not text or self._pattern is None:
+            return counts
+        rejected = self._rejected
+        check = not self._whitelisted
+        for m in self._pattern.finditer(text):
+            if m.lastindex == 1:
+                raw = m.group(1)
+                sym = raw.upper()
+                n = 2 if raw.isupper() else 1
+            else:
+                sym = m.group(2)
+                n = 1
+            if check and sym in rejected:
+                continue
+            counts[sym] = counts.get(sym, 0) + n
+        return counts
+
+    def extract(self, text: str) -> Set[str]:
+        return set(self.counts(text))
+
+    def batch_counts(self, texts: Iterable[str], per_text: bool = False):
+        """
+        Scan many texts as one newline-joined buffer and return aggregated ticker -> count.
+        Newlines are word boundaries and never part of a symbol, so results equal summing counts() per text.
+        When per_text=True, returns (counts, sets) where sets[i] holds the tickers found in texts[i].
+        """
+        texts = [t or "" for t in texts]
+        counts: Dict[str, int] = {}
+        sets: List[Set[str]] = [set() for _ in texts] if per_text else []
+        if not texts or self._pattern is None:
+            return (counts, sets) if per_text else counts
+
+        buf = "\n".join(texts)
+        rejected = self._rejected
+        check = not self._whitelisted
+
+        if not per_text:
+            # findall yields plain (dollar, bare) tuples, skipping match-object overhead
+            for raw, bare in self._pattern.findall(buf):
+                if raw:
+                    sym = raw.upper()
+                    n = 2 if raw.isupper() else 1
+                else:
+                    sym = bare
+                    n = 1
+                if check and sym in rejected:
+                    continue
+                counts[sym] = counts.get(sym, 0) + n
+            return counts
+
+        starts: List[int] = []
+        pos = 0
+        for t in texts:
+            starts.append(pos)
+            pos += len(t) + 1
+        for m in self._pattern.finditer(buf):
+            if m.lastindex == 1:
+                raw = m.group(1)
+                sym = raw.upper()
+                n = 2 if raw.isupper() else 1
+            else:
+                sym = m.group(2)
+                n = 1
+            if check and sym in rejected:
+                continue
+            counts[sym] = counts.get(sym, 0) + n
+            sets[bisect_right(starts, m.start()) - 1].add(sym)
+        return counts, sets
+
+
+@lru_cache(maxsize=32)
+def _cached_extractor(whitelist: Optional[FrozenSet[str]], blacklist: FrozenSet[str]) -> TickerExtractor:
+    return TickerExtractor(whitelist=whitelist, blacklist=blacklist)
+
+
+def get_extractor(
+    whitelist: Optional[Set[str]] = None,
+    blacklist: Optional[Set[str]] = None,
+) -> TickerExtractor:
+    """Return a shared, precompiled extractor for the given white/black lists."""
+    wl = frozenset(s.upper() for s in whitelist) if whitelist is not None else None
+    bl = frozenset(s.upper() for s in blacklist) if blacklist else frozenset()
+    return _cached_extractor(wl, bl)
 
 
 def extract_tickers(
@@ -40,34 +182,22 @@ def extract_tickers(
     if not text:
         return {} if count_occurrences else set()
 
-    found: Iterable[str] = []
-    dollar = [m.group(1) for m in _DOLLAR_TICKER.finditer(text)]
-    bare = [m.group(1) for m in _BARE_TICKER.finditer(text)]
-    found = list(dollar) + list(bare)
-
-    def accept(sym: str) -> Optional[str]:
-        s = _normalize(sym)
-        if not s:
-            return None
-        if blacklist and s in blacklist:
-            return None
-        if whitelist is not None and s not in whitelist:
-            return None
-        return s
-
+    counts = get_extractor(whitelist, blacklist).counts(text)
     if count_occurrences:
-        counts: Dict[str, int] = {}
-        for sym in found:
-            s = accept(sym)
-            if not s:
-                continue
-            counts[s] = counts.get(s, 0) + 1
         return counts
+    return set(counts)
 
-    out: Set[str] = set()
-    for sym in found:
-        s = accept(sym)
-        if s:
-            out.add(s)
-    return out
 
+def extract_tickers_batch(
+    texts: Iterable[str],
+    *,
+    whitelist: Optional[Set[str]] = None,
+    blacklist: Optional[Set[str]] = None,
+    per_text: bool = False,
+):
+    """
+    Extract tickers from a list of texts in one scan.
+    - Returns aggregated dict of ticker->count across all texts.
+    - When per_text=True, returns (counts, list of per-text ticker sets).
+    """
+    return get_extractor(whitelist, blacklist).batch_counts(texts, per_text=per_text)
@@ -0,0 +1,120 @@
+import json
+import re
+
+import pytest
+
+from backend.alerts_store import close_connections
+from backend.cache import TTLCache
+from backend.sentiment_cache import PostSentimentCache
+
+integrated_backend = pytest.importorskip("integrated_backend")
+SentimentAnalyzer = integrated_backend.SentimentAnalyzer
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """generate_content stand-in: advice for every '- TICKER:' line in the prompt, except `skip`."""
+
+    def __init__(self, skip=()):
+        self.skip = set(skip)
+        self.prompts = []
+
+    def tickers_in(self, prompt):
+        return re.findall(r"^\s*- ([A-Z]+):", prompt, re.M)
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        calls = len(self.prompts)
+        advice = {t: f"advice {t} #{calls}" for t in self.tickers_in(prompt) if t not in self.skip}
+        return FakeResponse(json.dumps(advice))
+
+
+def item(ticker, price=10.0, price_change=1.0, volume_ratio=2.0, sentiment_score=0.2):
+    return {"ticker": ticker, "price": price, "price_change": price_change,
+            "volume_ratio": volume_ratio, "sentiment_score": sentiment_score}
+
+
+@pytest.fixture
+def analyzer(tmp_path, monkeypatch):
+    monkeypatch.setattr(integrated_backend, "GEMINI_MIN_INTERVAL", 0)
+
+    def make(model, max_entries=64):
+        return SentimentAnalyzer(model=model, advice_cache=TTLCache(default_ttl=3600, max_entries=max_entries),
+                                 sentiment_cache=PostSentimentCache(db_path=str(tmp_path / "alerts.db")))
+    yield make
+    close_connections()
+
+
+def test_cached_advice_is_reused(analyzer):
+    model = FakeModel()
+    sa = analyzer(model)
+
+    first = sa.generate_advice_batch([item("GME"), item("AMC")])
+    # Small moves stay in the same buckets, so they reuse the advice too
+    second = sa.generate_advice_batch([item("GME", price=10.02), item("AMC", sentiment_score=0.21)])
+
+    assert len(model.prompts) == 1
+    assert first == second == {"GME": "advice GME #1", "AMC": "advice AMC #1"}
+
+
+def test_only_uncached_tickers_are_prompted_in_batches(analyzer, monkeypatch):
+    monkeypatch.setattr(integrated_backend, "ADVICE_BATCH_SIZE", 2)
+    model = FakeModel()
+    sa = analyzer(model)
+
+    sa.generate_advice_batch([item("GME")])
+    result = sa.generate_advice_batch([item(t) for t in ["GME", "AMC", "BB", "NOK"]])
+
+    assert [model.tickers_in(p) for p in model.prompts] == [["GME"], ["AMC", "BB"], ["NOK"]]
+    assert result["GME"] == "advice GME #1"
+    assert result["NOK"] == "advice NOK #3"
+
+
+def test_lru_evicts_least_recently_used(analyzer):
+    model = FakeModel()
+    sa = analyzer(model, max_entries=2)
+
+    sa.generate_advice_batch([item("GME"), item("AMC")])
+    sa.generate_advice_batch([item("GME")])  # cache hit, GME is now more recently used than AMC
+    sa.generate_advice_batch([item("BB")])  # evicts AMC
+    assert len(model.prompts) == 2
+
+    sa.generate_advice_batch([item("GME")])
+    assert len(model.prompts) == 2
+    sa.generate_advice_batch([item("AMC")])
+    assert [model.tickers_in(p) for p in model.prompts] == [["GME", "AMC"], ["BB"], ["AMC"]]
+
+
+def test_missing_tickers_get_uncached_rule_based_advice(analyzer):
+    sa = analyzer(FakeModel(skip={"AMC"}))
+
+    result = sa.generate_advice_batch([item("GME"), item("AMC")])
+    assert result["GME"] == "advice GME #1"
+    assert result["AMC"] == SentimentAnalyzer.rule_based_advice("AMC", 1.0, 2.0, 0.2)
+
+    # The next refresh asks the model again, for the missing ticker only
+    sa.model = FakeModel()
+    result = sa.generate_advice_batch([item("GME"), item("AMC")])
+    assert [sa.model.tickers_in(p) for p in sa.model.prompts] == [["AMC"]]
+    assert result["AMC"] == "advice AMC #1"
+
+
+def test_sentiment_goes_through_post_cache(analyzer):
+    class CsvModel:
+        prompts = []
+
+        def generate_content(self, prompt):
+            self.prompts.append(prompt)
+            return FakeResponse("post,ticker,sentiment,sentiment_score\n1,GME,bullish,0.9\n2,NONE,neutral,0")
+
+    model = CsvModel()
+    sa = analyzer(model)
+    posts = ["$GME is mooning", "nice weather"]
+
+    assert list(sa.analyze_sentiment(posts)["ticker"]) == ["GME"]
+    assert list(sa.analyze_sentiment(posts)["ticker"]) == ["GME"]
+    assert len(model.prompts) == 1
@@ -0,0 +1,120 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from signals.hotstocks import reddit
+
+SUBS = ["wsb", "stocks", "options"]
+POSTS_PER_SUB = 120  # more than one 100-post page
+
+
+def _listing(sub, now):
+    return [
+        {"kind": "t3", "data": {
+            "id": f"{sub}{i}", "name": f"t3_{sub}{i}", "title": f"$GME {sub} {i}", "selftext": "",
+            "score": i, "num_comments": 2, "permalink": f"/r/{sub}/comments/{sub}{i}/", "subreddit": sub,
+            "created_utc": now - 60 * i,
+        }}
+        for i in range(POSTS_PER_SUB)
+    ]
+
+
+@pytest.fixture
+def stub_reddit():
+    """Local keep-alive server for /r/<sub>/new.json and post comment JSON; yields (base url, request paths)."""
+    listings = {sub: _listing(sub, time.time()) for sub in SUBS}
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            hits.append(url.path)
+            parts = url.path.strip("/").split("/")
+            if parts[2] == "new.json":
+                items = listings[parts[1]]
+                start = 0
+                if "after" in query:
+                    start = [p["data"]["name"] for p in items].index(query["after"][0]) + 1
+                page = items[start:start + int(query["limit"][0])]
+                after = page[-1]["data"]["name"] if start + len(page) < len(items) else None
+                body = {"data": {"children": page, "after": after}}
+            else:
+                post_id = parts[3]
+                body = [{}, {"data": {"children": [
+                    {"kind": "t1", "data": {"body": f"$AMC on {post_id}", "replies": {"data": {"children": [
+                        {"kind": "t1", "data": {"body": f"reply on {post_id}", "replies": ""}},
+                    ]}}}},
+                    {"kind": "t1", "data": {"body": "$TSLA", "replies": ""}},
+                ]}}]
+            raw = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    reddit.configure_rate_limit(requests_per_second=10_000, burst=10_000, max_requests_per_second=10_000)
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", hits
+    finally:
+        reddit.configure_rate_limit()
+        reddit._POOL.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_concurrent_fetch_matches_sequential(stub_reddit):
+    base, hits = stub_reddit
+
+    expected_posts = [p for sub in SUBS for p in reddit.fetch_recent_posts(sub, lookback_hours=24, limit=150, base=base)]
+    expected_comments = {p["permalink"]: reddit.fetch_comments_for_post(p["permalink"], limit=10, base=base)
+                         for p in expected_posts}
+    sequential_hits = len(hits)
+    hits.clear()
+
+    posts = reddit.fetch_posts_for_subs(SUBS, lookback_hours=24, limit=150, max_workers=8, base=base)
+    comments = reddit.fetch_comments_for_posts([p["permalink"] for p in posts], limit=10, max_workers=8, base=base)
+
+    assert posts == expected_posts
+    assert comments == expected_comments
+    assert [p["subreddit"] for p in posts] == [s for s in SUBS for _ in range(POSTS_PER_SUB)]
+    assert comments["/r/wsb/comments/wsb0/"] == ["$AMC on wsb0", "reply on wsb0", "$TSLA"]
+    # Two listing pages per sub and one comment request per post, same as the sequential crawl
+    assert len(hits) == sequential_hits == 2 * len(SUBS) + len(SUBS) * POSTS_PER_SUB
+
+
+def test_pooled_requests_do_not_stall_on_delayed_ack(stub_reddit):
+    base, hits = stub_reddit
+    url = f"{base}/r/wsb/comments/wsb1/.json"
+    reddit._get_once(url)  # warm the pool
+
+    start = time.perf_counter()
+    for _ in range(20):
+        reddit._get_once(url)
+    pooled = time.perf_counter() - start
+
+    # The stub writes headers and body separately with Nagle on; a delayed ACK would cost ~40 ms per request
+    assert pooled < 20 * 0.02
+    assert len(hits) == 21
+
+
+def test_configure_rate_limit_keeps_limiter_when_unchanged():
+    reddit.configure_rate_limit()
+    limiter = reddit._LIMITER
+    reddit.configure_rate_limit()
+    assert reddit._LIMITER is limiter
+    reddit.configure_rate_limit(requests_per_second=5.0)
+    assert reddit._LIMITER is not limiter
+    reddit.configure_rate_limit()
@@ -0,0 +1,151 @@
+import re
+import threading
+
+import pytest
+
+from backend.alerts_store import close_connections
+from backend.sentiment_cache import NO_TICKER, PostSentimentCache, post_key
+
+
+class FakeModel:
+    """generate(prompt) stand-in: one CSV line per numbered post, scored by the $TICKERs it mentions."""
+
+    def __init__(self, scores=None, skip=()):
+        self.scores = scores or {}
+        self.skip = set(skip)  # post texts left out of the response, like a truncated reply
+        self.prompts = []
+
+    def posts_in(self, prompt):
+        return re.findall(r"^\s*\d+\. (.*)$", prompt.split("Posts:")[1].split("Example output")[0], re.M)
+
+    def __call__(self, prompt):
+        self.prompts.append(prompt)
+        lines = ["post,ticker,sentiment,sentiment_score"]
+        for i, post in enumerate(self.posts_in(prompt), 1):
+            if post in self.skip:
+                continue
+            tickers = re.findall(r"\$([A-Z]+)", post) or [NO_TICKER]
+            lines += [f"{i},{t},neutral,{self.scores.get(t, 0.5)}" for t in tickers]
+        return "\n".join(lines)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    yield PostSentimentCache(db_path=str(tmp_path / "alerts.db"), max_entries=16)
+    close_connections()
+
+
+def scores(df):
+    return dict(zip(df["ticker"], df["sentiment_score"]))
+
+
+def test_cached_posts_are_not_sent_again(cache):
+    model = FakeModel(scores={"GME": 0.8, "AMC": -0.4})
+    posts = ["$GME to the moon", "$AMC looks weak", "$GME  again"]
+
+    first = cache.analyze(posts, model)
+    second = cache.analyze(posts, model)
+
+    assert len(model.prompts) == 1
+    assert model.posts_in(model.prompts[0]) == ["$GME to the moon", "$AMC looks weak", "$GME again"]
+    assert scores(first) == scores(second) == {"AMC": -0.4, "GME": 0.8}
+    assert cache.stats()["hits"] == 3
+
+
+def test_whitespace_variants_share_an_entry(cache):
+    model = FakeModel()
+    cache.analyze(["$GME  to the\nmoon"], model)
+    cache.analyze(["  $GME to the moon "], model)
+
+    assert post_key("$GME  to the\nmoon") == post_key("  $GME to the moon ")
+    assert len(model.prompts) == 1
+
+
+def test_partial_response_caches_only_covered_posts(cache):
+    posts = ["$GME one", "$AMC two", "$TSLA three"]
+    partial = FakeModel(skip={"$AMC two"})
+
+    result = cache.analyze(posts, partial)
+    assert set(result["ticker"]) == {"GME", "TSLA"}
+    assert cache.stats()["entries"] == 2
+
+    model = FakeModel()
+    result = cache.analyze(posts, model)
+    # Only the post the first response left out is asked about again
+    assert [model.posts_in(p) for p in model.prompts] == [["$AMC two"]]
+    assert set(result["ticker"]) == {"AMC", "GME", "TSLA"}
+
+
+def test_post_without_tickers_is_cached(cache):
+    model = FakeModel()
+    cache.analyze(["nothing to see here", "$GME"], model)
+    result = cache.analyze(["nothing to see here", "$GME"], model)
+
+    assert len(model.prompts) == 1
+    assert list(result["ticker"]) == ["GME"]
+    assert cache.stats()["window_posts"] == 2
+
+
+def test_failed_call_is_retried_next_time(cache):
+    def broken(prompt):
+        raise RuntimeError("quota exceeded")
+
+    assert cache.analyze(["$GME"], broken).empty
+    assert cache.stats()["errors"] == 1
+
+    model = FakeModel()
+    assert list(cache.analyze(["$GME"], model)["ticker"]) == ["GME"]
+    assert len(model.prompts) == 1
+
+
+def test_window_aggregate_follows_post_list(cache):
+    model = FakeModel(scores={"GME": 1.0, "AMC": -1.0})
+    cache.analyze(["$GME a", "$GME b", "$AMC c"], model)
+    result = cache.analyze(["$GME b", "$AMC c", "$AMC d"], model)
+
+    # "$GME a" left the window and "$AMC d" entered it
+    assert scores(result) == {"AMC": -1.0, "GME": 1.0}
+    assert cache.stats()["window_posts"] == 3
+    assert cache.analyze([], model).empty
+
+
+def test_lru_evicts_least_recently_used_and_falls_back_to_disk(tmp_path):
+    cache = PostSentimentCache(db_path=str(tmp_path / "alerts.db"), max_entries=2)
+    model = FakeModel()
+    try:
+        cache.analyze(["$GME", "$AMC"], model)
+        cache.get_many([post_key("$GME")])  # GME is now more recently used than AMC
+        cache.analyze(["$TSLA"], model)
+
+        assert list(cache._entries) == [post_key("$GME"), post_key("$TSLA")]
+
+        # The evicted post is still on disk, so it costs no model call
+        cache.analyze(["$AMC"], model)
+        assert len(model.prompts) == 2
+        assert cache.stats()["disk_hits"] == 1
+        assert list(cache._entries) == [post_key("$TSLA"), post_key("$AMC")]
+    finally:
+        close_connections()
+
+
+def test_readers_are_not_blocked_during_model_call(cache):
+    started, release = threading.Event(), threading.Event()
+    model = FakeModel()
+
+    def slow(prompt):
+        started.set()
+        release.wait(5)
+        return model(prompt)
+
+    worker = threading.Thread(target=cache.analyze, args=(["$GME"], slow))
+    worker.start()
+    try:
+        assert started.wait(5)
+        reader = threading.Thread(target=lambda: (cache.stats(), cache.aggregate(), cache.get_many(["x"])))
+        reader.start()
+        reader.join(1)
+        assert not reader.is_alive()
+    finally:
+        release.set()
+        worker.join(5)
+    assert list(cache.aggregate()["ticker"]) == ["GME"]